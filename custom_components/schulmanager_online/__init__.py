@@ -1,23 +1,39 @@
 """The Schulmanager Online integration."""
 import asyncio
 import logging
-from datetime import timedelta
+from typing import Any, Dict, Optional
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_PASSWORD, CONF_USERNAME, Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.const import (
+    CONF_PASSWORD,
+    CONF_USERNAME,
+    EVENT_HOMEASSISTANT_STOP,
+    Platform,
+)
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
-from .api import SchulmanagerOnlineAPI, SchulmanagerOnlineAPIError
+from .api import SchulmanagerOnlineAPI, SchulmanagerOnlineAPIError, SchulmanagerOnlineAuthError
 from .const import (
+    CONF_CHROMEDRIVER_PATH,
     CONF_ENABLE_SCRAPING,
     CONF_TOKEN,
-    DEFAULT_SCAN_INTERVAL,
+    DATA_PENDING_SESSIONS,
     DOMAIN,
-    SCRAPING_SCAN_INTERVAL,
 )
-from .scraper import SchulmanagerOnlineScraper, SchulmanagerOnlineScraperError
+from .coordinator import (
+    API_COORDINATORS,
+    SCRAPING_COORDINATORS,
+    SchulmanagerOnlineData,
+    SchulmanagerOnlineLettersCoordinator,
+    SchulmanagerOnlineSourceCoordinator,
+)
+from .backends import async_create_scraper
+from .letters import SchulmanagerOnlineLettersIndex
+from .schedule import SchulmanagerOnlinePollingSchedule
+from .session import SchulmanagerOnlineSessionStore
+from .snapshot import SchulmanagerOnlineSnapshotStore
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -29,93 +45,143 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     session = async_get_clientsession(hass)
     api = SchulmanagerOnlineAPI(entry.data[CONF_TOKEN], session)
 
+    snapshot_store = SchulmanagerOnlineSnapshotStore(hass, entry.entry_id)
+    await snapshot_store.async_load()
+
+    coordinators = {
+        "letters": SchulmanagerOnlineLettersCoordinator(
+            hass, api, SchulmanagerOnlineLettersIndex(hass, entry.entry_id), snapshot_store
+        )
+    }
+
     # Initialize scraper if enabled
     scraper = None
+    coordinator_classes = list(API_COORDINATORS)
     if entry.data.get(CONF_ENABLE_SCRAPING, False):
-        scraper = SchulmanagerOnlineScraper(
-            entry.data[CONF_USERNAME], entry.data[CONF_PASSWORD]
+        session_store = SchulmanagerOnlineSessionStore(
+            hass, entry.entry_id, entry.data[CONF_PASSWORD]
         )
+        # The config flow already logged in, reuse that session for the first scrape
+        pending = hass.data.get(DOMAIN, {}).get(DATA_PENDING_SESSIONS, {})
+        if session := pending.pop(entry.data[CONF_USERNAME], None):
+            await session_store.async_save(session)
 
-    coordinator = SchulmanagerOnlineDataUpdateCoordinator(hass, api, scraper)
+        scraper = await async_create_scraper(
+            hass,
+            entry.data[CONF_USERNAME],
+            entry.data[CONF_PASSWORD],
+            chromedriver_path=entry.data.get(CONF_CHROMEDRIVER_PATH),
+            session_store=session_store,
+        )
 
-    await coordinator.async_config_entry_first_refresh()
+        async def _async_close_scraper(_: Event) -> None:
+            """Release the browser when Home Assistant stops, it does not unload entries then."""
+            await scraper.async_close()
+
+        # The last scraper to close quits Chrome and chromedriver
+        entry.async_on_unload(
+            hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _async_close_scraper)
+        )
+        coordinator_classes.extend(SCRAPING_COORDINATORS)
+
+    # Homework, exams and the timetable only need the token, the scraper is their fallback.
+    # The schedule is shared, the timetable tells it which days are school days
+    schedule = SchulmanagerOnlinePollingSchedule(entry.options)
+    for coordinator_class in coordinator_classes:
+        coordinators[coordinator_class.source] = coordinator_class(
+            hass, api, scraper, entry.options, snapshot_store, schedule
+        )
+
+    # Show the last good data right away, the live data follows in the background
+    letters, *extended = coordinators.values()
+    if not await letters.async_restore():
+        # Nothing to show yet, so the first setup waits for the letters and reports errors
+        try:
+            await letters.async_config_entry_first_refresh()
+        except Exception:
+            if scraper:
+                await scraper.async_close()
+            raise
+    else:
+        entry.async_create_background_task(
+            hass, letters.async_refresh(), f"{DOMAIN}_letters_refresh_{entry.entry_id}"
+        )
+
+    await asyncio.gather(*(coordinator.async_restore() for coordinator in extended))
+    # Further accounts with scraping defer these sources, so not every scrape starts at once
+    entry.async_create_background_task(
+        hass,
+        _async_initial_refresh(api, extended, scraper.stagger_delay if scraper else 0),
+        f"{DOMAIN}_initial_refresh_{entry.entry_id}",
+    )
 
     hass.data.setdefault(DOMAIN, {})
-    hass.data[DOMAIN][entry.entry_id] = coordinator
+    hass.data[DOMAIN][entry.entry_id] = SchulmanagerOnlineData(api, scraper, coordinators)
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
 
     return True
 
 
+async def _async_initial_refresh(
+    api: SchulmanagerOnlineAPI,
+    coordinators: list[SchulmanagerOnlineSourceCoordinator],
+    delay: float,
+) -> None:
+    """Run the first refresh of the extended sources after a delay."""
+    if delay:
+        await asyncio.sleep(delay)
+
+    # Resolve the student up front so the first refreshes share one batched request
+    try:
+        await api.get_student()
+    except (SchulmanagerOnlineAPIError, SchulmanagerOnlineAuthError) as err:
+        _LOGGER.debug("Could not resolve student, extended data will be scraped: %s", err)
+
+    await asyncio.gather(*(coordinator.async_refresh() for coordinator in coordinators))
+
+
+async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Migrate an old config entry."""
+    if entry.version == 1:
+        # Unique IDs were DOMAIN_sensortype and collided between config entries
+        old_prefix = f"{DOMAIN}_"
+
+        @callback
+        def _migrate_unique_id(entity_entry: er.RegistryEntry) -> Optional[Dict[str, Any]]:
+            if not entity_entry.unique_id.startswith(old_prefix):
+                return None
+            sensor_type = entity_entry.unique_id[len(old_prefix):]
+            return {"new_unique_id": f"{entry.entry_id}_{sensor_type}"}
+
+        await er.async_migrate_entries(hass, entry.entry_id, _migrate_unique_id)
+        hass.config_entries.async_update_entry(entry, version=2)
+        _LOGGER.debug("Migrated config entry %s to version 2", entry.entry_id)
+
+    return True
+
+
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the config entry after its options changed."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        hass.data[DOMAIN].pop(entry.entry_id)
+        data: SchulmanagerOnlineData = hass.data[DOMAIN].pop(entry.entry_id)
+        if data.scraper:
+            await data.scraper.async_close()
 
     return unload_ok
 
 
-class SchulmanagerOnlineDataUpdateCoordinator(DataUpdateCoordinator):
-    """Class to manage fetching data from the API and scraper."""
-
-    def __init__(
-        self,
-        hass: HomeAssistant,
-        api: SchulmanagerOnlineAPI,
-        scraper: SchulmanagerOnlineScraper = None,
-    ) -> None:
-        """Initialize."""
-        self.api = api
-        self.scraper = scraper
-        
-        # Use different update intervals based on whether scraping is enabled
-        update_interval = (
-            SCRAPING_SCAN_INTERVAL if scraper else DEFAULT_SCAN_INTERVAL
-        )
-        
-        super().__init__(
-            hass,
-            _LOGGER,
-            name=DOMAIN,
-            update_interval=timedelta(seconds=update_interval),
-        )
-
-    async def _async_update_data(self):
-        """Update data via library."""
-        data = {}
-        
-        try:
-            # Always fetch API data (letters)
-            letters = await self.api.get_letters()
-            data.update({
-                "letters": letters,
-                "unread_count": sum(1 for letter in letters if not letter["read"]),
-                "total_count": len(letters),
-            })
-            
-            # Fetch scraping data if scraper is available
-            if self.scraper:
-                try:
-                    scraping_data = await self.scraper.scrape_all_data()
-                    data.update({
-                        "homework": scraping_data.get("homework", []),
-                        "exams": scraping_data.get("exams", []),
-                        "timetable": scraping_data.get("timetable", []),
-                        "appointments": scraping_data.get("appointments", []),
-                    })
-                except SchulmanagerOnlineScraperError as exception:
-                    _LOGGER.warning("Scraping failed, continuing with API data only: %s", exception)
-                    # Continue with API data only, don't fail completely
-                    data.update({
-                        "homework": [],
-                        "exams": [],
-                        "timetable": [],
-                        "appointments": [],
-                    })
-            
-            return data
-            
-        except SchulmanagerOnlineAPIError as exception:
-            raise UpdateFailed(f"Error communicating with API: {exception}") from exception
-
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the stored letters index, snapshot and browser session of a deleted config entry."""
+    await SchulmanagerOnlineLettersIndex(hass, entry.entry_id).async_remove()
+    await SchulmanagerOnlineSnapshotStore(hass, entry.entry_id).async_remove()
+    if entry.data.get(CONF_ENABLE_SCRAPING, False):
+        await SchulmanagerOnlineSessionStore(
+            hass, entry.entry_id, entry.data[CONF_PASSWORD]
+        ).async_remove()
@@ -1,15 +1,41 @@
 """API client for Schulmanager Online."""
+import asyncio
+import hashlib
 import json
 import logging
-from typing import Any, Dict, List, Optional
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple, TypeVar
 
 import aiohttp
 import async_timeout
 
-from .const import API_BASE_URL, BUNDLE_VERSION
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
+from .const import API_ROOT_URL, BUNDLE_VERSION, EXAMS_LOOKAHEAD_DAYS
+from .models import Lesson, LessonStatus, TimetableWeek
+from .resilience import CircuitBreaker, async_retry
 
 _LOGGER = logging.getLogger(__name__)
 
+# A single api/calls request: (moduleName, endpointName, parameters)
+ApiCall = Tuple[str, str, Optional[Dict[str, Any]]]
+
+_T = TypeVar("_T")
+
+# Number of distinct requests whose last response and parsed results are kept
+_RESPONSE_CACHE_SIZE = 16
+
+
+def _remember(cache: Dict[str, Any], key: str, value: Any) -> None:
+    """Store a value in a small cache, dropping the oldest entry when it is full."""
+    cache.pop(key, None)
+    cache[key] = value
+    if len(cache) > _RESPONSE_CACHE_SIZE:
+        del cache[next(iter(cache))]
+
 
 class SchulmanagerOnlineAPIError(Exception):
     """Exception to indicate a general API error."""
@@ -19,66 +45,324 @@ class SchulmanagerOnlineAuthError(Exception):
     """Exception to indicate an authentication error."""
 
 
+class SchulmanagerOnlineTransientError(SchulmanagerOnlineAPIError):
+    """Exception to indicate a temporary error that is worth retrying."""
+
+
+def _is_transient_status(status: int) -> bool:
+    """Return whether an HTTP status is a temporary server-side failure."""
+    return status == 429 or status >= 500
+
+
+def _format_time(value: Optional[str]) -> str:
+    """Shorten an API time such as 08:00:00 to 08:00."""
+    return value[:5] if value else ""
+
+
+def _to_lesson(
+    period: int,
+    lesson: Dict[str, Any],
+    status: LessonStatus = LessonStatus.REGULAR,
+    original: Optional[str] = None,
+) -> Lesson:
+    """Create a timetable lesson from an API lesson."""
+    subject = (lesson.get("subject") or {}).get("abbreviation") or lesson.get("subjectLabel") or ""
+    teacher = " ".join(
+        teacher.get("abbreviation", "") for teacher in lesson.get("teachers") or []
+    )
+    room = (lesson.get("room") or {}).get("name") or ""
+    return Lesson(period, subject, teacher, room, status, original)
+
+
+async def async_login(
+    session: aiohttp.ClientSession,
+    username: str,
+    password: str,
+    api_root: str = API_ROOT_URL,
+) -> Dict[str, Any]:
+    """Log in with username and password over HTTP, without a browser.
+
+    Returns the login response with the JWT of the new session.
+    """
+    try:
+        async with async_timeout.timeout(10):
+            async with session.post(
+                f"{api_root}/login",
+                json={
+                    "emailOrUsername": username,
+                    "password": password,
+                    "hash": None,
+                    "mobileApp": False,
+                    "institutionId": None,
+                },
+            ) as response:
+                if response.status in (400, 401):
+                    raise SchulmanagerOnlineAuthError("Invalid credentials")
+
+                if response.status != 200:
+                    raise SchulmanagerOnlineAPIError(
+                        f"Login request failed with status {response.status}"
+                    )
+
+                login = await response.json()
+
+    except aiohttp.ClientError as err:
+        raise SchulmanagerOnlineAPIError(f"Request failed: {err}") from err
+    except asyncio.TimeoutError as err:
+        raise SchulmanagerOnlineAPIError("Request timeout") from err
+
+    if not isinstance(login, dict) or not login.get("jwt"):
+        raise SchulmanagerOnlineAuthError("Login did not return a session")
+    return login
+
+
 class SchulmanagerOnlineAPI:
     """API client for Schulmanager Online."""
 
-    def __init__(self, token: str, session: aiohttp.ClientSession) -> None:
+    def __init__(
+        self,
+        token: str,
+        session: aiohttp.ClientSession,
+        api_root: str = API_ROOT_URL,
+    ) -> None:
         """Initialize the API client."""
         self._token = token
         self._session = session
+        self._api_root = api_root
+        self._student: Optional[Dict[str, Any]] = None
+        self._pending: List[Tuple[ApiCall, asyncio.Future]] = []
+        # Batches being sent; the loop only keeps weak references to tasks
+        self._send_tasks: Set[asyncio.Task] = set()
+        # Digest and decoded results of the last response, by request body
+        self._responses: Dict[str, Tuple[bytes, List[Dict[str, Any]]]] = {}
+        # Parsed data of the last result, by call
+        self._parsed: Dict[str, Tuple[Dict[str, Any], Any]] = {}
+        self.breaker = CircuitBreaker("Schulmanager Online API")
 
-    async def _make_request(self, module_name: str, endpoint_name: str) -> Dict[str, Any]:
-        """Make a request to the Schulmanager Online API."""
-        headers = {
+    @property
+    def _headers(self) -> Dict[str, str]:
+        """Return the headers sent with every request."""
+        return {
             "Authorization": f"Bearer {self._token}",
             "Content-Type": "application/json",
         }
 
-        data = {
+    async def _make_batch_request(self, calls: Sequence[ApiCall]) -> List[Dict[str, Any]]:
+        """Send several module/endpoint calls in a single api/calls request.
+
+        Transient errors are retried with backoff. After repeated failures the
+        circuit breaker refuses requests for a while without sending them.
+
+        Returns one result per call, in the order of ``calls``.
+        """
+        if not self.breaker.allow_request():
+            raise SchulmanagerOnlineAPIError("API requests paused after repeated failures")
+
+        try:
+            results = await async_retry(
+                lambda: self._send_batch_request(calls), (SchulmanagerOnlineTransientError,)
+            )
+        except SchulmanagerOnlineTransientError as err:
+            self.breaker.record_failure(err)
+            raise
+        self.breaker.record_success()
+        return results
+
+    async def _send_batch_request(self, calls: Sequence[ApiCall]) -> List[Dict[str, Any]]:
+        """Send the api/calls request once."""
+        requests = []
+        for module_name, endpoint_name, parameters in calls:
+            request = {
+                "moduleName": module_name,
+                "endpointName": endpoint_name,
+            }
+            if parameters is not None:
+                request["parameters"] = parameters
+            requests.append(request)
+
+        data = json.dumps({
             "bundleVersion": BUNDLE_VERSION,
-            "requests": [
-                {
-                    "moduleName": module_name,
-                    "endpointName": endpoint_name,
-                }
-            ],
-        }
+            "requests": requests,
+        })
 
         try:
             async with async_timeout.timeout(10):
                 async with self._session.post(
-                    API_BASE_URL,
-                    headers=headers,
-                    data=json.dumps(data),
+                    f"{self._api_root}/calls",
+                    headers=self._headers,
+                    data=data,
                 ) as response:
                     if response.status == 401:
                         raise SchulmanagerOnlineAuthError("Invalid token")
-                    
+
+                    if _is_transient_status(response.status):
+                        raise SchulmanagerOnlineTransientError(
+                            f"API request failed with status {response.status}"
+                        )
+
                     if response.status != 200:
                         raise SchulmanagerOnlineAPIError(
                             f"API request failed with status {response.status}"
                         )
 
-                    response_data = await response.json()
-                    return response_data
+                    body = await response.read()
 
         except aiohttp.ClientError as err:
-            raise SchulmanagerOnlineAPIError(f"Request failed: {err}") from err
+            raise SchulmanagerOnlineTransientError(f"Request failed: {err}") from err
         except asyncio.TimeoutError as err:
-            raise SchulmanagerOnlineAPIError("Request timeout") from err
+            raise SchulmanagerOnlineTransientError("Request timeout") from err
+
+        # Most polls return exactly what the last one did, reuse its results
+        digest = hashlib.blake2b(body, digest_size=16).digest()
+        cached = self._responses.get(data)
+        if cached is not None and cached[0] == digest:
+            return cached[1]
 
-    async def get_letters(self) -> List[Dict[str, Any]]:
-        """Get letters from Schulmanager Online."""
         try:
-            response_data = await self._make_request("letters", "get-letters")
-            
-            if "results" not in response_data or not response_data["results"]:
-                return []
+            results = json_loads(body).get("results") or []
+        except (ValueError, AttributeError) as err:
+            raise SchulmanagerOnlineAPIError("Failed to decode API response") from err
+        if len(results) != len(calls):
+            raise SchulmanagerOnlineAPIError(
+                f"Expected {len(calls)} results, got {len(results)}"
+            )
+        _remember(self._responses, data, (digest, results))
+        return results
+
+    async def _make_request(
+        self,
+        module_name: str,
+        endpoint_name: str,
+        parameters: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Make a call to the Schulmanager Online API and return its result.
+
+        Calls made in the same event loop iteration are sent as one batched
+        request. The coordinators refresh on their own schedules, so in
+        practice only the first refresh after setup and the timetable weeks
+        fetched together are batched; other refreshes make their own request.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append(((module_name, endpoint_name, parameters), future))
+        if len(self._pending) == 1:
+            loop.call_soon(self._flush_pending)
+        return await future
+
+    def _flush_pending(self) -> None:
+        """Send all calls queued since the last flush."""
+        pending, self._pending = self._pending, []
+        task = asyncio.get_running_loop().create_task(self._async_send_pending(pending))
+        self._send_tasks.add(task)
+        task.add_done_callback(self._send_tasks.discard)
+
+    async def _async_send_pending(self, pending: List[Tuple[ApiCall, asyncio.Future]]) -> None:
+        """Send queued calls in one batch and hand each result to its caller."""
+        try:
+            results = await self._make_batch_request([call for call, _ in pending])
+        except Exception as err:  # pylint: disable=broad-except
+            # Every caller must be released, whatever went wrong
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(err)
+            return
+
+        for (_, future), result in zip(pending, results):
+            if not future.done():
+                future.set_result(result)
+
+    @staticmethod
+    def _get_result_data(result: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Return the data of a single api/calls result."""
+        status = result.get("status", 200)
+        if status != 200:
+            raise SchulmanagerOnlineAPIError(f"API call failed with status {status}")
+        return result.get("data") or []
+
+    async def get_student(self) -> Dict[str, Any]:
+        """Get the student the account belongs to or is a parent of."""
+        if self._student is not None:
+            return self._student
+
+        user = await async_retry(self._get_login_status, (SchulmanagerOnlineTransientError,))
+
+        student = user.get("associatedStudent")
+        if not student and user.get("associatedParents"):
+            student = user["associatedParents"][0].get("student")
+        if not student:
+            raise SchulmanagerOnlineAPIError("No student associated with this account")
+
+        self._student = student
+        return student
 
-            letters_data = response_data["results"][0].get("data", [])
-            
+    async def _get_login_status(self) -> Dict[str, Any]:
+        """Return the user of the login status."""
+        try:
+            async with async_timeout.timeout(10):
+                async with self._session.get(
+                    f"{self._api_root}/login-status", headers=self._headers
+                ) as response:
+                    if response.status == 401:
+                        raise SchulmanagerOnlineAuthError("Invalid token")
+
+                    if _is_transient_status(response.status):
+                        raise SchulmanagerOnlineTransientError(
+                            f"Login status request failed with status {response.status}"
+                        )
+
+                    if response.status != 200:
+                        raise SchulmanagerOnlineAPIError(
+                            f"Login status request failed with status {response.status}"
+                        )
+
+                    return (await response.json())["user"]
+
+        except aiohttp.ClientError as err:
+            raise SchulmanagerOnlineTransientError(f"Request failed: {err}") from err
+        except asyncio.TimeoutError as err:
+            raise SchulmanagerOnlineTransientError("Request timeout") from err
+        except (KeyError, TypeError) as err:
+            raise SchulmanagerOnlineAPIError("Failed to parse login status") from err
+
+    @staticmethod
+    def _letters_call() -> ApiCall:
+        """Return the call fetching the letters."""
+        return ("letters", "get-letters", None)
+
+    @staticmethod
+    def _homework_call(student: Dict[str, Any]) -> ApiCall:
+        """Return the call fetching the classbook homework."""
+        return ("classbook", "get-homework", {"student": student})
+
+    @staticmethod
+    def _exams_call(student: Dict[str, Any]) -> ApiCall:
+        """Return the call fetching the upcoming exams."""
+        start = date.today()
+        end = start + timedelta(days=EXAMS_LOOKAHEAD_DAYS)
+        return (
+            "exams",
+            "get-exams",
+            {"student": student, "start": start.isoformat(), "end": end.isoformat()},
+        )
+
+    @staticmethod
+    def _timetable_call(student: Dict[str, Any], start_date: Optional[date] = None) -> ApiCall:
+        """Return the call fetching the lessons of the week containing start_date."""
+        today = start_date or date.today()
+        monday = today - timedelta(days=today.weekday())
+        sunday = monday + timedelta(days=6)
+        return (
+            "schedules",
+            "get-actual-lessons",
+            {"student": student, "start": monday.isoformat(), "end": sunday.isoformat()},
+        )
+
+    @classmethod
+    def _parse_letters(cls, result: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Parse a get-letters result."""
+        try:
             letters = []
-            for letter in letters_data:
+            for letter in cls._get_result_data(result):
                 processed_letter = {
                     "id": letter.get("id"),
                     "title": letter.get("title"),
@@ -86,13 +370,125 @@ class SchulmanagerOnlineAPI:
                     "read": bool(letter.get("studentStatuses", [{}])[0].get("readTimestamp"))
                 }
                 letters.append(processed_letter)
-            
+
             return letters
 
         except (KeyError, IndexError, TypeError) as err:
             _LOGGER.error("Failed to parse letters response: %s", err)
             raise SchulmanagerOnlineAPIError("Failed to parse API response") from err
 
+    @classmethod
+    def _parse_homework(cls, result: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Parse a get-homework result."""
+        try:
+            homework_list = []
+            for day in cls._get_result_data(result):
+                for homework in day.get("homeworks") or []:
+                    subject = homework.get("subject", "")
+                    task = homework.get("homework", "")
+                    homework_list.append({
+                        "date": day["date"],
+                        "subject": subject,
+                        "task": task,
+                        "description": f"{subject}: {task}",
+                    })
+            return homework_list
+
+        except (KeyError, TypeError, AttributeError) as err:
+            _LOGGER.error("Failed to parse homework response: %s", err)
+            raise SchulmanagerOnlineAPIError("Failed to parse API response") from err
+
+    @classmethod
+    def _parse_exams(cls, result: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Parse a get-exams result."""
+        try:
+            exams = []
+            for exam in cls._get_result_data(result):
+                subject = (exam.get("subject") or {}).get("name", "")
+                begin_time = _format_time((exam.get("startClassHour") or {}).get("from"))
+                end_time = _format_time((exam.get("endClassHour") or {}).get("until"))
+                full_time = f"{begin_time} - {end_time}"
+                exams.append({
+                    "date": exam["date"],
+                    "subject": subject,
+                    "time": full_time,
+                    "description": f"{full_time} {subject}",
+                })
+            return exams
+
+        except (KeyError, TypeError, AttributeError) as err:
+            _LOGGER.error("Failed to parse exams response: %s", err)
+            raise SchulmanagerOnlineAPIError("Failed to parse API response") from err
+
+    @classmethod
+    def _parse_timetable(cls, result: Dict[str, Any]) -> TimetableWeek:
+        """Parse a get-actual-lessons result into a week grid."""
+        try:
+            cells = {}
+            for lesson in cls._get_result_data(result):
+                weekday = date.fromisoformat(lesson["date"]).weekday()
+                hour = int(lesson["classHour"]["number"])
+                actual = lesson.get("actualLesson")
+                original = (lesson.get("originalLessons") or [None])[0]
+
+                if lesson.get("isCancelled") or not actual:
+                    if original:
+                        cells[(weekday, hour)] = _to_lesson(hour, original, LessonStatus.CANCELLED)
+                elif lesson.get("isSubstitution") and original:
+                    cells[(weekday, hour)] = _to_lesson(
+                        hour, actual, LessonStatus.SUBSTITUTED, _to_lesson(hour, original).render()
+                    )
+                else:
+                    cells[(weekday, hour)] = _to_lesson(hour, actual)
+
+        except (KeyError, TypeError, ValueError, AttributeError) as err:
+            _LOGGER.error("Failed to parse schedules response: %s", err)
+            raise SchulmanagerOnlineAPIError("Failed to parse API response") from err
+
+        hours = [hour for _, hour in cells]
+        first_hour = min(hours, default=1)
+        week = TimetableWeek(max(hours, default=0) - first_hour + 1, first_hour)
+        for (weekday, hour), lesson in cells.items():
+            week.set(weekday, hour, lesson)
+        return week
+
+    async def _get_parsed(self, call: ApiCall, parse: Callable[[Dict[str, Any]], _T]) -> _T:
+        """Make a call and parse its result, unless it is the result parsed last time.
+
+        Unchanged responses hand out the same result objects again, so they
+        are recognized by identity without comparing them.
+        """
+        result = await self._make_request(*call)
+        key = json.dumps(call, sort_keys=True)
+        cached = self._parsed.get(key)
+        if cached is not None and cached[0] is result:
+            return cached[1]
+
+        parsed = parse(result)
+        _remember(self._parsed, key, (result, parsed))
+        return parsed
+
+    async def get_letters(self) -> List[Dict[str, Any]]:
+        """Get letters from Schulmanager Online."""
+        return await self._get_parsed(self._letters_call(), self._parse_letters)
+
+    async def get_homework(self) -> List[Dict[str, Any]]:
+        """Get homework from the classbook module."""
+        student = await self.get_student()
+        return await self._get_parsed(self._homework_call(student), self._parse_homework)
+
+    async def get_exams(self) -> List[Dict[str, Any]]:
+        """Get upcoming exams from the exams module."""
+        student = await self.get_student()
+        return await self._get_parsed(self._exams_call(student), self._parse_exams)
+
+    async def get_timetable(self, start_date: Optional[date] = None) -> TimetableWeek:
+        """Get the week's lessons from the schedules module."""
+        student = await self.get_student()
+        return await self._get_parsed(
+            self._timetable_call(student, start_date), self._parse_timetable
+        )
+
     async def test_connection(self) -> bool:
         """Test the connection to Schulmanager Online."""
         try:
@@ -102,4 +498,3 @@ class SchulmanagerOnlineAPI:
             return False
         except SchulmanagerOnlineAPIError:
             return False
-
@@ -0,0 +1,54 @@
+"""Lazily imported data backends of Schulmanager Online.
+
+The JSON API is always loaded. The scraping backend pulls in Selenium and
+webdriver-manager, so it is only imported once a config entry enables
+scraping, and then in the executor, as imports block.
+"""
+from __future__ import annotations
+
+import importlib
+from types import ModuleType
+from typing import TYPE_CHECKING, Dict, Optional
+
+from homeassistant.core import HomeAssistant
+
+from .session import SchulmanagerOnlineSessionStore
+
+if TYPE_CHECKING:
+    from .scraper import SchulmanagerOnlineScraper
+
+# Backend name to the modules it needs, in import order
+BACKENDS: Dict[str, tuple] = {
+    "scraper": ("driver", "scraper"),
+}
+
+
+async def async_import_backend(hass: HomeAssistant, name: str) -> Dict[str, ModuleType]:
+    """Import the modules of a backend without blocking the event loop."""
+    return await hass.async_add_executor_job(_import_backend, name)
+
+
+def _import_backend(name: str) -> Dict[str, ModuleType]:
+    """Import the modules of a backend, returning them by name."""
+    return {
+        module: importlib.import_module(f".{module}", __package__)
+        for module in BACKENDS[name]
+    }
+
+
+async def async_create_scraper(
+    hass: HomeAssistant,
+    username: str,
+    password: str,
+    chromedriver_path: Optional[str] = None,
+    session_store: Optional[SchulmanagerOnlineSessionStore] = None,
+) -> SchulmanagerOnlineScraper:
+    """Create a scraper using the browser pool shared by all config entries."""
+    modules = await async_import_backend(hass, "scraper")
+    return modules["scraper"].SchulmanagerOnlineScraper(
+        username,
+        password,
+        browser_pool=modules["driver"].async_get_browser_pool(hass),
+        chromedriver_path=chromedriver_path,
+        session_store=session_store,
+    )
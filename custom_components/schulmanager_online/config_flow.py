@@ -1,17 +1,37 @@
 """Config flow for Schulmanager Online integration."""
 import logging
+import os
 from typing import Any, Dict, Optional
 
 import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
-from .api import SchulmanagerOnlineAPI, SchulmanagerOnlineAPIError, SchulmanagerOnlineAuthError
-from .const import CONF_ENABLE_SCRAPING, CONF_TOKEN, DOMAIN
-from .scraper import SchulmanagerOnlineScraper, SchulmanagerOnlineScraperAuthError, SchulmanagerOnlineScraperError
+from .api import (
+    SchulmanagerOnlineAPI,
+    SchulmanagerOnlineAPIError,
+    SchulmanagerOnlineAuthError,
+    async_login,
+)
+from .const import (
+    CONF_ACTIVE_SCAN_INTERVAL,
+    CONF_CHROMEDRIVER_PATH,
+    CONF_ENABLE_SCRAPING,
+    CONF_IDLE_SCAN_INTERVAL,
+    CONF_MAX_ATTRIBUTE_ITEMS,
+    CONF_TIMETABLE_WEEKS,
+    CONF_TOKEN,
+    DATA_PENDING_SESSIONS,
+    DEFAULT_ACTIVE_SCAN_INTERVAL,
+    DEFAULT_IDLE_SCAN_INTERVAL,
+    DEFAULT_MAX_ATTRIBUTE_ITEMS,
+    DEFAULT_TIMETABLE_WEEKS,
+    DOMAIN,
+)
+from .exceptions import SchulmanagerOnlineScraperAuthError, SchulmanagerOnlineScraperError
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -26,6 +46,7 @@ STEP_SCRAPING_DATA_SCHEMA = vol.Schema(
     {
         vol.Required(CONF_USERNAME): str,
         vol.Required(CONF_PASSWORD): str,
+        vol.Optional(CONF_CHROMEDRIVER_PATH): str,
     }
 )
 
@@ -45,14 +66,25 @@ async def validate_api_input(hass: HomeAssistant, data: Dict[str, Any]) -> Dict[
 
 
 async def validate_scraping_input(hass: HomeAssistant, data: Dict[str, Any]) -> Dict[str, Any]:
-    """Validate the scraping input allows us to connect."""
-    scraper = SchulmanagerOnlineScraper(data[CONF_USERNAME], data[CONF_PASSWORD])
+    """Validate the scraping credentials with an HTTP login, without starting Chrome."""
+    chromedriver_path = data.get(CONF_CHROMEDRIVER_PATH)
+    if chromedriver_path and not await hass.async_add_executor_job(
+        os.path.isfile, chromedriver_path
+    ):
+        raise SchulmanagerOnlineScraperError(f"Chromedriver not found: {chromedriver_path}")
 
     try:
-        if not await scraper.test_connection():
-            raise SchulmanagerOnlineScraperAuthError("Invalid credentials")
-    except SchulmanagerOnlineScraperError as err:
-        raise err
+        login = await async_login(
+            async_get_clientsession(hass), data[CONF_USERNAME], data[CONF_PASSWORD]
+        )
+    except SchulmanagerOnlineAuthError as err:
+        raise SchulmanagerOnlineScraperAuthError(str(err)) from err
+    except SchulmanagerOnlineAPIError as err:
+        raise SchulmanagerOnlineScraperError(str(err)) from err
+
+    # Hand the session to the new entry, so its first scrape does not log in again
+    pending = hass.data.setdefault(DOMAIN, {}).setdefault(DATA_PENDING_SESSIONS, {})
+    pending[data[CONF_USERNAME]] = {"cookies": [], "jwt": login["jwt"]}
 
     return {"title": "Schulmanager Online"}
 
@@ -60,11 +92,21 @@ async def validate_scraping_input(hass: HomeAssistant, data: Dict[str, Any]) ->
 class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for Schulmanager Online."""
 
-    VERSION = 1
+    VERSION = 2
 
     def __init__(self):
         """Initialize the config flow."""
         self._user_input = {}
+        # Username of the login session this flow left for the new entry
+        self._pending_username: Optional[str] = None
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> config_entries.OptionsFlow:
+        """Get the options flow for this handler."""
+        return OptionsFlowHandler(config_entry)
 
     async def async_step_user(
         self, user_input: Optional[Dict[str, Any]] = None
@@ -127,6 +169,58 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 step_id="scraping", data_schema=STEP_SCRAPING_DATA_SCHEMA, errors=errors
             )
 
+        self._pending_username = user_input[CONF_USERNAME]
         # Create entry with both API and scraping configuration
         return self.async_create_entry(title=info["title"], data=self._user_input)
 
+    @callback
+    def async_remove(self) -> None:
+        """Drop the login session unless the new entry's setup already took it.
+
+        Called when the flow ends, also when it was aborted or abandoned.
+        """
+        if self._pending_username is not None:
+            pending = self.hass.data.get(DOMAIN, {}).get(DATA_PENDING_SESSIONS, {})
+            pending.pop(self._pending_username, None)
+
+
+class OptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle options for Schulmanager Online."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize the options flow."""
+        self._entry = config_entry
+
+    async def async_step_init(
+        self, user_input: Optional[Dict[str, Any]] = None
+    ) -> FlowResult:
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        options = self._entry.options
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(
+                        CONF_MAX_ATTRIBUTE_ITEMS,
+                        default=options.get(CONF_MAX_ATTRIBUTE_ITEMS, DEFAULT_MAX_ATTRIBUTE_ITEMS),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=500)),
+                    vol.Optional(
+                        CONF_TIMETABLE_WEEKS,
+                        default=options.get(CONF_TIMETABLE_WEEKS, DEFAULT_TIMETABLE_WEEKS),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=6)),
+                    vol.Optional(
+                        CONF_ACTIVE_SCAN_INTERVAL,
+                        default=options.get(
+                            CONF_ACTIVE_SCAN_INTERVAL, DEFAULT_ACTIVE_SCAN_INTERVAL
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=5, max=120)),
+                    vol.Optional(
+                        CONF_IDLE_SCAN_INTERVAL,
+                        default=options.get(CONF_IDLE_SCAN_INTERVAL, DEFAULT_IDLE_SCAN_INTERVAL),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=30, max=1440)),
+                }
+            ),
+        )
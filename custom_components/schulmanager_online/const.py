@@ -1,4 +1,5 @@
 """Constants for the Schulmanager Online integration."""
+from datetime import timedelta
 
 DOMAIN = "schulmanager_online"
 
@@ -7,13 +8,29 @@ CONF_TOKEN = "token"
 CONF_USERNAME = "username"
 CONF_PASSWORD = "password"
 CONF_ENABLE_SCRAPING = "enable_scraping"
+CONF_CHROMEDRIVER_PATH = "chromedriver_path"
+
+# Options
+CONF_MAX_ATTRIBUTE_ITEMS = "max_attribute_items"
+DEFAULT_MAX_ATTRIBUTE_ITEMS = 20
+CONF_TIMETABLE_WEEKS = "timetable_weeks"
+DEFAULT_TIMETABLE_WEEKS = 3  # the current week and the next two
+CONF_ACTIVE_SCAN_INTERVAL = "active_scan_interval"
+DEFAULT_ACTIVE_SCAN_INTERVAL = 15  # minutes, shortest interval on school days
+CONF_IDLE_SCAN_INTERVAL = "idle_scan_interval"
+DEFAULT_IDLE_SCAN_INTERVAL = 360  # minutes, at night, on weekends and in the holidays
 
 # API constants
-API_BASE_URL = "https://login.schulmanager-online.de/api/calls"
+API_ROOT_URL = "https://login.schulmanager-online.de/api"
 BUNDLE_VERSION = "c2a60433dcd7c3fc6ee1"
 
+# Number of days ahead for which exams are requested
+EXAMS_LOOKAHEAD_DAYS = 56
+
 # Web scraping URLs
+BASE_URL = "https://login.schulmanager-online.de/"
 LOGIN_URL = "https://login.schulmanager-online.de/#/login"
+DASHBOARD_URL = "https://login.schulmanager-online.de/#/"
 HOMEWORK_URL = "https://login.schulmanager-online.de/#/modules/classbook/homework/"
 SCHEDULES_URL = "https://login.schulmanager-online.de/#/modules/schedules/view/"
 
@@ -21,39 +38,133 @@ SCHEDULES_URL = "https://login.schulmanager-online.de/#/modules/schedules/view/"
 DEFAULT_SCAN_INTERVAL = 300  # 5 minutes
 SCRAPING_SCAN_INTERVAL = 900  # 15 minutes (less frequent for web scraping)
 
+# Data sources, each refreshed by its own coordinator
+SOURCES = {
+    "letters": {"scan_interval": DEFAULT_SCAN_INTERVAL, "timeout": 30},
+    "homework": {"scan_interval": SCRAPING_SCAN_INTERVAL, "timeout": 180},
+    "exams": {"scan_interval": 3600, "timeout": 180},
+    "timetable": {"scan_interval": SCRAPING_SCAN_INTERVAL, "timeout": 180},
+    "appointments": {"scan_interval": 3600, "timeout": 180},
+}
+
+# Hours of a school day in which homework, exams, timetable and appointments are polled often, [start, end)
+SCHOOL_DAY_ACTIVE_HOURS = (6, 18)
+
+# Timetable cache lifetimes per week, past weeks are never refreshed
+TIMETABLE_CURRENT_WEEK_TTL = timedelta(minutes=15)
+TIMETABLE_FUTURE_WEEK_TTL = timedelta(hours=6)
+
+# Retries of transient errors, in seconds
+RETRY_ATTEMPTS = 3
+RETRY_BASE_DELAY = 1
+RETRY_MAX_DELAY = 10
+
+# Circuit breakers of the API and the scraper, in seconds
+BREAKER_FAILURE_THRESHOLD = 3
+BREAKER_RESET_TIMEOUT = 300
+BREAKER_MAX_RESET_TIMEOUT = 3600
+
+# How long the last good data is kept, marked stale, while a source keeps failing
+STALE_DATA_MAX_AGE = timedelta(hours=24)
+
+# Page readiness of the scraper, in seconds
+READINESS_POLL_INTERVAL = 0.1
+READINESS_MIN_TIMEOUT = 5
+READINESS_MAX_TIMEOUT = 30
+READINESS_TIMEOUT_FACTOR = 3  # timeout as a multiple of the recent load time
+
+# Web driver
+DRIVER_MAX_MEMORY_GROWTH = 256 * 1024 * 1024  # restart Chrome after growing by 256 MB
+PAGE_LOAD_TIMEOUT = 30  # seconds, so a hanging site fails a scrape instead of blocking it
+SCRAPE_STAGGER = 30  # seconds between the first scrapes of several config entries
+CHROME_ARGUMENTS = (
+    "--headless=new",
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+    "--window-size=1280,800",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--no-first-run",
+    "--mute-audio",
+    "--blink-settings=imagesEnabled=false",
+    "--renderer-process-limit=1",
+    "--js-flags=--max-old-space-size=256",  # cap the renderer's JavaScript heap in MB
+)
+# Resources the parsers never look at, blocked through the DevTools protocol
+BLOCKED_URL_PATTERNS = (
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.svg", "*.webp", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot", "*.css",
+)
+CHROME_BINARIES = ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser")
+CHROMEDRIVER_STORAGE_KEY = f"{DOMAIN}.chromedriver"
+CHROMEDRIVER_STORAGE_VERSION = 1
+
+# Browser session persistence
+SESSION_STORAGE_VERSION = 1
+SESSION_KEY_ITERATIONS = 100_000
+
+# Letters index persistence
+LETTERS_STORAGE_VERSION = 1
+LETTERS_SAVE_DELAY = 10
+
+# Snapshot of the last good data, restored at setup
+SNAPSHOT_STORAGE_VERSION = 1
+SNAPSHOT_SAVE_DELAY = 60
+
+# hass.data keys shared by all config entries
+DATA_CHROMEDRIVER_RESOLVER = "chromedriver_resolver"
+DATA_BROWSER_POOL = "browser_pool"
+DATA_PENDING_SESSIONS = "pending_sessions"  # sessions from the config flow login, by username
+
 # Sensor types
 SENSOR_TYPES = {
     "letters": {
+        "source": "letters",
+        "data_keys": ("letters", "total_count", "unread_count"),
         "name": "Letters",
         "icon": "mdi:email",
         "unit": None,
         "device_class": None,
     },
     "unread_letters": {
+        "source": "letters",
+        "data_keys": ("unread_count",),
         "name": "Unread Letters",
         "icon": "mdi:email-outline",
         "unit": None,
         "device_class": None,
     },
     "homework": {
+        "source": "homework",
+        "data_keys": ("homework",),
         "name": "Homework",
         "icon": "mdi:book-open-page-variant",
         "unit": None,
         "device_class": None,
     },
     "exams": {
+        "source": "exams",
+        "data_keys": ("exams",),
         "name": "Exams",
         "icon": "mdi:clipboard-text",
         "unit": None,
         "device_class": None,
     },
     "appointments": {
+        "source": "appointments",
+        "data_keys": ("appointments",),
         "name": "Appointments",
         "icon": "mdi:calendar",
         "unit": None,
         "device_class": None,
     },
     "timetable": {
+        "source": "timetable",
+        "data_keys": ("timetable", "timetable_weeks"),
         "name": "Timetable",
         "icon": "mdi:timetable",
         "unit": None,
@@ -70,4 +181,16 @@ ATTR_TIMETABLE = "timetable"
 ATTR_LAST_UPDATE = "last_update"
 ATTR_TOTAL_COUNT = "total_count"
 ATTR_UNREAD_COUNT = "unread_count"
+ATTR_UPCOMING_HOMEWORK = "upcoming_homework"
+ATTR_UPCOMING_EXAMS = "upcoming_exams"
+ATTR_WEEKS = "weeks"
+ATTR_STALE = "stale"
+ATTR_DATA_AGE = "data_age"
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+# Services
+SERVICE_GET_ITEMS = "get_items"
+ATTR_OFFSET = "offset"
+ATTR_LIMIT = "limit"
 
@@ -0,0 +1,476 @@
+"""Data update coordinators for Schulmanager Online."""
+from __future__ import annotations
+
+import asyncio
+from bisect import bisect_left
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import TYPE_CHECKING, Any, Dict, List, Mapping, Optional, Tuple
+
+import async_timeout
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
+
+from .api import SchulmanagerOnlineAPI, SchulmanagerOnlineAPIError, SchulmanagerOnlineAuthError
+from .const import (
+    CONF_TIMETABLE_WEEKS,
+    DEFAULT_TIMETABLE_WEEKS,
+    DOMAIN,
+    SOURCES,
+    STALE_DATA_MAX_AGE,
+    TIMETABLE_CURRENT_WEEK_TTL,
+    TIMETABLE_FUTURE_WEEK_TTL,
+)
+from .letters import SchulmanagerOnlineLettersIndex
+from .models import TimetableWeek
+from .exceptions import SchulmanagerOnlineScraperAuthError, SchulmanagerOnlineScraperError
+from .schedule import SchulmanagerOnlinePollingSchedule
+from .snapshot import SchulmanagerOnlineSnapshotStore
+
+if TYPE_CHECKING:
+    from .scraper import SchulmanagerOnlineScraper
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _json_default(value: Any) -> Any:
+    """Serialize data models such as the timetable week."""
+    if hasattr(value, "as_dict"):
+        return value.as_dict()
+    return str(value)
+
+
+def fingerprint(value: Any) -> str:
+    """Return a stable hash of a JSON-like data slice."""
+    normalized = json.dumps(value, sort_keys=True, separators=(",", ":"), default=_json_default)
+    return hashlib.blake2b(normalized.encode(), digest_size=16).hexdigest()
+
+
+class DateIndex:
+    """Items sorted once by their ISO date, so upcoming items can be found by bisection."""
+
+    __slots__ = ("items", "_dates", "_upcoming_day", "_upcoming")
+
+    def __init__(self, items: List[Dict[str, Any]]) -> None:
+        """Sort the items by date."""
+        self.items = sorted(items, key=lambda item: item.get("date", ""))
+        self._dates = [item.get("date", "") for item in self.items]
+        self._upcoming_day: Optional[date] = None
+        self._upcoming: List[Dict[str, Any]] = []
+
+    def upcoming(self, today: date) -> List[Dict[str, Any]]:
+        """Return the items dated today or later, cached until the day changes."""
+        if today != self._upcoming_day:
+            self._upcoming = self.items[bisect_left(self._dates, today.isoformat()):]
+            self._upcoming_day = today
+        return self._upcoming
+
+
+class SchulmanagerOnlineSourceCoordinator(DataUpdateCoordinator):
+    """Base class for coordinators that refresh a single data source.
+
+    Every source has its own update interval, timeout and failure state, so
+    a slow scrape never delays the cheap API data.
+    """
+
+    source: str
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api: SchulmanagerOnlineAPI,
+        scraper: Optional[SchulmanagerOnlineScraper] = None,
+        options: Optional[Mapping[str, Any]] = None,
+        snapshot_store: Optional[SchulmanagerOnlineSnapshotStore] = None,
+        schedule: Optional[SchulmanagerOnlinePollingSchedule] = None,
+    ) -> None:
+        """Initialize."""
+        self.api = api
+        self.scraper = scraper
+        self.options = options or {}
+        self._snapshot_store = snapshot_store
+        self._schedule = schedule
+        self._scan_interval = timedelta(seconds=SOURCES[self.source]["scan_interval"])
+        self._timeout = SOURCES[self.source]["timeout"]
+        # Hash of every key of the data, so entities can tell whether their slice changed
+        self.fingerprints: Dict[str, str] = {}
+        # When the data was fetched, and whether it was restored from a snapshot since
+        self.fetched_at: Optional[datetime] = None
+        self.stale = False
+
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"{DOMAIN}_{self.source}",
+            update_interval=self._scan_interval,
+        )
+
+    async def _async_update_data(self) -> Dict[str, Any]:
+        """Update data via library."""
+        if self._schedule is not None:
+            # Applies to the poll scheduled after this refresh
+            self.update_interval = self._schedule.interval(self._scan_interval)
+
+        try:
+            async with async_timeout.timeout(self._timeout):
+                data = await self._async_fetch()
+        except (SchulmanagerOnlineAuthError, SchulmanagerOnlineScraperAuthError) as exception:
+            raise UpdateFailed(f"Authentication failed: {exception}") from exception
+        except asyncio.TimeoutError as exception:
+            if self.scraper is not None:
+                # The API gives up well within the timeout, so a hanging site was cut off
+                # here, before the scraper's retries could count it as a failure
+                self.scraper.breaker.record_failure(
+                    SchulmanagerOnlineScraperError(f"Scraping {self.source} timed out")
+                )
+            return self._keep_last_good_data(exception)
+        except (
+            SchulmanagerOnlineAPIError,
+            SchulmanagerOnlineScraperError,
+        ) as exception:
+            return self._keep_last_good_data(exception)
+
+        if data is not self.data:
+            # Unchanged data is handed back as the same object, its fingerprints still hold
+            self.fingerprints = {key: fingerprint(value) for key, value in data.items()}
+        self.fetched_at = dt_util.utcnow()
+        self.stale = False
+        if self._snapshot_store is not None:
+            self._snapshot_store.async_set(self.source, self._snapshot_data(data), self.fetched_at)
+        return data
+
+    def _keep_last_good_data(self, exception: Exception) -> Dict[str, Any]:
+        """Return the last good data marked stale, while it is not too old.
+
+        A transient failure then no longer wipes the sensors.
+        """
+        if isinstance(exception, asyncio.TimeoutError):
+            message = f"Fetching {self.source} timed out"
+        elif isinstance(exception, SchulmanagerOnlineScraperError):
+            message = f"Error scraping {self.source}: {exception}"
+        else:
+            message = f"Error communicating with API: {exception}"
+
+        if (
+            self.data is None
+            or self.fetched_at is None
+            or dt_util.utcnow() - self.fetched_at > STALE_DATA_MAX_AGE
+        ):
+            raise UpdateFailed(message) from exception
+
+        _LOGGER.log(
+            logging.DEBUG if self.stale else logging.WARNING,
+            "%s, keeping the data fetched at %s",
+            message,
+            self.fetched_at,
+        )
+        self.stale = True
+        return self.data
+
+    async def async_restore(self) -> bool:
+        """Show the data of the stored snapshot, marked as stale, until a live refresh.
+
+        Returns whether there was a snapshot to restore.
+        """
+        if self._snapshot_store is None:
+            return False
+        if (snapshot := self._snapshot_store.async_get(self.source)) is None:
+            return False
+
+        snapshot_data, fetched_at = snapshot
+        data = await self._async_restore_data(snapshot_data, fetched_at)
+        self.data = data
+        self.fingerprints = {key: fingerprint(value) for key, value in data.items()}
+        self.fetched_at = fetched_at
+        self.stale = True
+        return True
+
+    async def _async_fetch(self) -> Dict[str, Any]:
+        """Fetch the data of this source."""
+        raise NotImplementedError
+
+    def _snapshot_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Return the data in the JSON form it is stored in the snapshot."""
+        return data
+
+    async def _async_restore_data(
+        self, snapshot_data: Dict[str, Any], fetched_at: datetime
+    ) -> Dict[str, Any]:
+        """Return the data from its stored JSON form."""
+        return snapshot_data
+
+
+class SchulmanagerOnlineLettersCoordinator(SchulmanagerOnlineSourceCoordinator):
+    """Coordinator for the letters, which are only available through the API."""
+
+    source = "letters"
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api: SchulmanagerOnlineAPI,
+        letters_index: SchulmanagerOnlineLettersIndex,
+        snapshot_store: Optional[SchulmanagerOnlineSnapshotStore] = None,
+    ) -> None:
+        """Initialize."""
+        super().__init__(hass, api, snapshot_store=snapshot_store)
+        self.letters_index = letters_index
+        # The list from the API merged last, to recognize an unchanged response
+        self._merged_letters: Optional[List[Dict[str, Any]]] = None
+
+    async def _async_fetch(self) -> Dict[str, Any]:
+        """Fetch the letters and merge them into the local index."""
+        await self.letters_index.async_load()
+        letters = await self.api.get_letters()
+        if letters is self._merged_letters and self.data is not None:
+            # The API hands out the same list for an unchanged response, nothing to merge
+            return self.data
+
+        # get-letters has no "changed since" parameter, so merge the full list in one pass
+        self.letters_index.async_merge(letters)
+        self._merged_letters = letters
+        return self._index_data()
+
+    def _index_data(self) -> Dict[str, Any]:
+        """Return the data from the letters index."""
+        return {
+            "letters": self.letters_index.letters,
+            "unread_count": self.letters_index.unread_count,
+            "total_count": self.letters_index.total_count,
+        }
+
+    def _snapshot_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Store nothing, the letters index persists the letters itself."""
+        return {}
+
+    async def _async_restore_data(
+        self, snapshot_data: Dict[str, Any], fetched_at: datetime
+    ) -> Dict[str, Any]:
+        """Return the data from the stored letters index."""
+        await self.letters_index.async_load()
+        return self._index_data()
+
+
+class SchulmanagerOnlineExtendedCoordinator(SchulmanagerOnlineSourceCoordinator):
+    """Coordinator for a source served by the JSON API with the scraper as fallback."""
+
+    async def _async_fetch(self) -> Dict[str, Any]:
+        """Fetch the data from the API, scraping it if the API fails."""
+        try:
+            return {self.source: self._process(await self._async_fetch_api())}
+        except (SchulmanagerOnlineAPIError, SchulmanagerOnlineAuthError) as exception:
+            if self.scraper is None:
+                raise
+            _LOGGER.debug("API backend failed for %s, scraping instead: %s", self.source, exception)
+
+        return {self.source: self._process(await self._async_scrape())}
+
+    def _process(self, items: Any) -> Any:
+        """Post-process freshly fetched items."""
+        return items
+
+    async def _async_fetch_api(self) -> Any:
+        """Fetch the data from the API."""
+        raise NotImplementedError
+
+    async def _async_scrape(self) -> Any:
+        """Scrape the data with the browser."""
+        raise NotImplementedError
+
+
+class SchulmanagerOnlineDatedCoordinator(SchulmanagerOnlineExtendedCoordinator):
+    """Coordinator for dated items, indexed by date once per refresh."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api: SchulmanagerOnlineAPI,
+        scraper: Optional[SchulmanagerOnlineScraper] = None,
+        options: Optional[Mapping[str, Any]] = None,
+        snapshot_store: Optional[SchulmanagerOnlineSnapshotStore] = None,
+        schedule: Optional[SchulmanagerOnlinePollingSchedule] = None,
+    ) -> None:
+        """Initialize."""
+        super().__init__(hass, api, scraper, options, snapshot_store, schedule)
+        self.date_index = DateIndex([])
+
+    def _process(self, items: Any) -> Any:
+        """Sort the items by date."""
+        self.date_index = DateIndex(items)
+        return self.date_index.items
+
+    async def _async_restore_data(
+        self, snapshot_data: Dict[str, Any], fetched_at: datetime
+    ) -> Dict[str, Any]:
+        """Index the stored items by date."""
+        return {self.source: self._process(snapshot_data.get(self.source, []))}
+
+
+class SchulmanagerOnlineHomeworkCoordinator(SchulmanagerOnlineDatedCoordinator):
+    """Coordinator for the homework."""
+
+    source = "homework"
+
+    async def _async_fetch_api(self) -> Any:
+        """Fetch the homework from the API."""
+        return await self.api.get_homework()
+
+    async def _async_scrape(self) -> Any:
+        """Scrape the homework."""
+        return await self.scraper.scrape_homework()
+
+
+class SchulmanagerOnlineExamsCoordinator(SchulmanagerOnlineDatedCoordinator):
+    """Coordinator for the exams."""
+
+    source = "exams"
+
+    async def _async_fetch_api(self) -> Any:
+        """Fetch the exams from the API."""
+        return await self.api.get_exams()
+
+    async def _async_scrape(self) -> Any:
+        """Scrape the exams."""
+        return await self.scraper.scrape_exams()
+
+
+def week_key(monday: date) -> str:
+    """Return the ISO week key, e.g. 2024-W03, of the week starting on monday."""
+    year, week, _ = monday.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+class SchulmanagerOnlineTimetableCoordinator(SchulmanagerOnlineSourceCoordinator):
+    """Coordinator for the timetable of the current and the following weeks.
+
+    Every week is cached under its ISO week key. Past weeks are never
+    fetched again, the current week is refreshed after a short TTL and
+    future weeks after a longer one, so a poll only fetches stale weeks.
+    """
+
+    source = "timetable"
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api: SchulmanagerOnlineAPI,
+        scraper: Optional[SchulmanagerOnlineScraper] = None,
+        options: Optional[Mapping[str, Any]] = None,
+        snapshot_store: Optional[SchulmanagerOnlineSnapshotStore] = None,
+        schedule: Optional[SchulmanagerOnlinePollingSchedule] = None,
+    ) -> None:
+        """Initialize."""
+        super().__init__(hass, api, scraper, options, snapshot_store, schedule)
+        self._weeks = self.options.get(CONF_TIMETABLE_WEEKS, DEFAULT_TIMETABLE_WEEKS)
+        self._cache: Dict[str, Tuple[TimetableWeek, datetime]] = {}
+
+    @staticmethod
+    def _is_stale(monday: date, today: date, fetched_at: datetime, now: datetime) -> bool:
+        """Return whether a cached week needs to be fetched again."""
+        if monday + timedelta(days=7) <= today:
+            return False
+        if monday <= today:
+            return now - fetched_at >= TIMETABLE_CURRENT_WEEK_TTL
+        return now - fetched_at >= TIMETABLE_FUTURE_WEEK_TTL
+
+    async def _async_fetch(self) -> Dict[str, Any]:
+        """Fetch the stale weeks of the prefetch window."""
+        today = dt_util.now().date()
+        now = dt_util.utcnow()
+        current_monday = today - timedelta(days=today.weekday())
+        mondays = [current_monday + timedelta(weeks=offset) for offset in range(self._weeks)]
+        keys = [week_key(monday) for monday in mondays]
+
+        stale = [
+            monday
+            for monday, key in zip(mondays, keys)
+            if key not in self._cache or self._is_stale(monday, today, self._cache[key][1], now)
+        ]
+        # Weeks requested from the API together share one batched request
+        results = await asyncio.gather(
+            *(self._async_fetch_week(monday) for monday in stale), return_exceptions=True
+        )
+        for monday, result in zip(stale, results):
+            key = week_key(monday)
+            if isinstance(result, Exception):
+                if monday == current_monday and key not in self._cache:
+                    raise result
+                _LOGGER.debug("Keeping cached timetable for %s: %s", key, result)
+                continue
+            self._cache[key] = (result, now)
+
+        # Forget weeks that left the window
+        self._cache = {key: self._cache[key] for key in keys if key in self._cache}
+        weeks = {key: week for key, (week, _) in self._cache.items()}
+        if self._schedule is not None:
+            self._schedule.update_timetable(weeks)
+
+        return {"timetable": weeks[keys[0]], "timetable_weeks": weeks}
+
+    async def _async_fetch_week(self, monday: date) -> TimetableWeek:
+        """Fetch one week from the API, scraping it if the API fails."""
+        try:
+            return await self.api.get_timetable(monday)
+        except (SchulmanagerOnlineAPIError, SchulmanagerOnlineAuthError) as exception:
+            if self.scraper is None:
+                raise
+            _LOGGER.debug("API backend failed for timetable, scraping instead: %s", exception)
+
+        return await self.scraper.scrape_timetable(monday.isoformat())
+
+    def _snapshot_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Store the weeks as dicts."""
+        return {
+            "timetable_weeks": {
+                key: week.as_dict() for key, week in data["timetable_weeks"].items()
+            }
+        }
+
+    async def _async_restore_data(
+        self, snapshot_data: Dict[str, Any], fetched_at: datetime
+    ) -> Dict[str, Any]:
+        """Rebuild the weeks, which also count as cached from the time they were fetched."""
+        weeks = {
+            key: TimetableWeek.from_dict(week)
+            for key, week in snapshot_data.get("timetable_weeks", {}).items()
+        }
+        self._cache = {key: (week, fetched_at) for key, week in weeks.items()}
+        if self._schedule is not None:
+            self._schedule.update_timetable(weeks)
+
+        today = dt_util.now().date()
+        current_key = week_key(today - timedelta(days=today.weekday()))
+        return {"timetable": weeks.get(current_key, TimetableWeek()), "timetable_weeks": weeks}
+
+
+class SchulmanagerOnlineAppointmentsCoordinator(SchulmanagerOnlineSourceCoordinator):
+    """Coordinator for the appointments."""
+
+    source = "appointments"
+
+    async def _async_fetch(self) -> Dict[str, Any]:
+        """Fetch the appointments."""
+        return {self.source: await self.scraper.scrape_appointments()}
+
+
+# Sources served by the JSON API, with the scraper as fallback when scraping is enabled
+API_COORDINATORS = (
+    SchulmanagerOnlineHomeworkCoordinator,
+    SchulmanagerOnlineExamsCoordinator,
+    SchulmanagerOnlineTimetableCoordinator,
+)
+# Sources only the scraper provides
+SCRAPING_COORDINATORS = (SchulmanagerOnlineAppointmentsCoordinator,)
+
+
+@dataclass
+class SchulmanagerOnlineData:
+    """Runtime data of a config entry."""
+
+    api: SchulmanagerOnlineAPI
+    scraper: Optional[SchulmanagerOnlineScraper]
+    coordinators: Dict[str, SchulmanagerOnlineSourceCoordinator]
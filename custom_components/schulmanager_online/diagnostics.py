@@ -0,0 +1,47 @@
+"""Diagnostics support for Schulmanager Online."""
+from __future__ import annotations
+
+from typing import Any, Dict
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_TOKEN, DOMAIN
+from .coordinator import SchulmanagerOnlineData
+
+TO_REDACT = {CONF_TOKEN, CONF_USERNAME, CONF_PASSWORD}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> Dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    data: SchulmanagerOnlineData = hass.data[DOMAIN][entry.entry_id]
+
+    diagnostics: Dict[str, Any] = {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "api": {"breaker": data.api.breaker.as_dict()},
+        "sources": {
+            source: {
+                "last_update_success": coordinator.last_update_success,
+                "last_exception": str(coordinator.last_exception)
+                if coordinator.last_exception
+                else None,
+                "fetched_at": coordinator.fetched_at,
+                "stale": coordinator.stale,
+                "update_interval": coordinator.update_interval.total_seconds(),
+            }
+            for source, coordinator in data.coordinators.items()
+        },
+    }
+    if data.scraper is not None:
+        diagnostics["scraper"] = {
+            "breaker": data.scraper.breaker.as_dict(),
+            "metrics": data.scraper.metrics,
+        }
+    return diagnostics
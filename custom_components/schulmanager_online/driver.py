@@ -0,0 +1,505 @@
+"""WebDriver lifecycle management for Schulmanager Online."""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+import logging
+import os
+import re
+import shutil
+import subprocess
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from selenium import webdriver
+from selenium.common.exceptions import SessionNotCreatedException, WebDriverException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+
+from .const import (
+    BLOCKED_URL_PATTERNS,
+    CHROME_ARGUMENTS,
+    CHROME_BINARIES,
+    CHROMEDRIVER_STORAGE_KEY,
+    CHROMEDRIVER_STORAGE_VERSION,
+    DATA_BROWSER_POOL,
+    DATA_CHROMEDRIVER_RESOLVER,
+    DOMAIN,
+    DRIVER_MAX_MEMORY_GROWTH,
+    PAGE_LOAD_TIMEOUT,
+    SCRAPE_STAGGER,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+_CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+_VERSION_RE = re.compile(r"(\d+)\.\d+\.\d+\.\d+")
+
+
+def _get_binary_version(binary: str) -> Optional[str]:
+    """Return the version reported by `binary --version`."""
+    try:
+        output = subprocess.run(
+            [binary, "--version"],
+            capture_output=True,
+            check=False,
+            text=True,
+            timeout=10,
+        ).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+    match = _VERSION_RE.search(output)
+    return match.group(0) if match else None
+
+
+def _major(version: Optional[str]) -> Optional[str]:
+    """Return the major component of a Chrome version string."""
+    return version.split(".", 1)[0] if version else None
+
+
+def get_chrome_version() -> Optional[str]:
+    """Return the version of the installed Chrome/Chromium browser."""
+    for name in CHROME_BINARIES:
+        if binary := shutil.which(name):
+            if version := _get_binary_version(binary):
+                return version
+    return None
+
+
+class ChromeDriverResolver:
+    """Resolve the chromedriver binary once and remember it on disk.
+
+    Resolution order: a pinned path from the config entry, a previously
+    resolved path for the same Chrome version, a chromedriver on the PATH
+    matching the installed Chrome, and only then webdriver-manager, which
+    needs network access.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the resolver."""
+        self._hass = hass
+        self._store: Store = Store(hass, CHROMEDRIVER_STORAGE_VERSION, CHROMEDRIVER_STORAGE_KEY)
+        self._lock = asyncio.Lock()
+        self._path: Optional[str] = None
+
+    async def async_get_path(self, pinned_path: Optional[str] = None) -> str:
+        """Return the path of a chromedriver binary usable with the installed Chrome."""
+        if pinned_path:
+            if not await self._hass.async_add_executor_job(os.path.isfile, pinned_path):
+                raise FileNotFoundError(f"Pinned chromedriver not found: {pinned_path}")
+            return pinned_path
+
+        async with self._lock:
+            if self._path is None:
+                cached: Dict[str, Any] = await self._store.async_load() or {}
+                resolved = await self._hass.async_add_executor_job(self._resolve, cached)
+                if resolved != cached:
+                    await self._store.async_save(resolved)
+                self._path = resolved["path"]
+            return self._path
+
+    def invalidate(self) -> None:
+        """Forget the resolved path, e.g. after Chrome refused to start with it."""
+        self._path = None
+        self._hass.async_create_task(self._store.async_remove())
+
+    @staticmethod
+    def _resolve(cached: Dict[str, Any]) -> Dict[str, Any]:
+        """Resolve the chromedriver binary, preferring sources without network access."""
+        chrome_version = get_chrome_version()
+
+        if (
+            cached.get("path")
+            and cached.get("chrome_version") == chrome_version
+            and os.path.isfile(cached["path"])
+        ):
+            _LOGGER.debug("Using cached chromedriver %s", cached["path"])
+            return cached
+
+        if system_driver := shutil.which("chromedriver"):
+            driver_version = _get_binary_version(system_driver)
+            if chrome_version is None or _major(driver_version) == _major(chrome_version):
+                _LOGGER.debug("Using system chromedriver %s (%s)", system_driver, driver_version)
+                return {
+                    "path": system_driver,
+                    "chrome_version": chrome_version,
+                    "driver_version": driver_version,
+                }
+
+        _LOGGER.info("Downloading chromedriver for Chrome %s", chrome_version)
+        path = ChromeDriverManager().install()
+        return {
+            "path": path,
+            "chrome_version": chrome_version,
+            "driver_version": _get_binary_version(path),
+        }
+
+
+def async_get_chromedriver_resolver(hass: HomeAssistant) -> ChromeDriverResolver:
+    """Return the resolver shared by all config entries for this Home Assistant run."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if DATA_CHROMEDRIVER_RESOLVER not in domain_data:
+        domain_data[DATA_CHROMEDRIVER_RESOLVER] = ChromeDriverResolver(hass)
+    return domain_data[DATA_CHROMEDRIVER_RESOLVER]
+
+
+class ProcessTreeUsage(NamedTuple):
+    """Resource usage of a process and all its descendants."""
+
+    rss: int  # bytes
+    peak_rss: int  # bytes, summed high-water marks of the processes
+    cpu_time: float  # seconds of user and system time
+
+
+def _get_process_tree(root_pid: int) -> Optional[List[int]]:
+    """Return the pids of a process and all its descendants."""
+    if not os.path.isdir("/proc"):
+        return None
+
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", encoding="ascii", errors="replace") as stat_file:
+                stat = stat_file.read()
+        except OSError:
+            continue
+        # The command name may contain spaces, the parent pid follows the state field
+        ppid = int(stat.rsplit(")", 1)[1].split()[1])
+        children.setdefault(ppid, []).append(int(entry))
+
+    pids = []
+    stack = [root_pid]
+    while stack:
+        pid = stack.pop()
+        pids.append(pid)
+        stack.extend(children.get(pid, []))
+    return pids
+
+
+def get_process_tree_rss(root_pid: int) -> Optional[int]:
+    """Return the resident set size in bytes of a process and all its descendants."""
+    if (pids := _get_process_tree(root_pid)) is None:
+        return None
+
+    total = 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/statm", encoding="ascii") as statm_file:
+                total += int(statm_file.read().split()[1]) * _PAGE_SIZE
+        except (OSError, IndexError, ValueError):
+            continue
+
+    return total
+
+
+def get_process_tree_usage(root_pid: int, reset_peak: bool = False) -> Optional[ProcessTreeUsage]:
+    """Return the memory and CPU usage of a process and all its descendants.
+
+    With reset_peak, the high-water marks are reset afterwards, so the next
+    call reports the peak reached in between.
+    """
+    if (pids := _get_process_tree(root_pid)) is None:
+        return None
+
+    rss = peak_rss = 0
+    cpu_ticks = 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/stat", encoding="ascii", errors="replace") as stat_file:
+                fields = stat_file.read().rsplit(")", 1)[1].split()
+            with open(f"/proc/{pid}/status", encoding="ascii", errors="replace") as status_file:
+                status = dict(
+                    line.split(":", 1) for line in status_file if ":" in line
+                )
+        except OSError:
+            continue
+        # utime and stime are the 14th and 15th field of stat
+        cpu_ticks += int(fields[11]) + int(fields[12])
+        rss += int(status.get("VmRSS", "0 kB").split()[0]) * 1024
+        peak_rss += int(status.get("VmHWM", "0 kB").split()[0]) * 1024
+        if reset_peak:
+            try:
+                with open(f"/proc/{pid}/clear_refs", "w", encoding="ascii") as clear_file:
+                    clear_file.write("5")
+            except OSError:
+                pass
+
+    return ProcessTreeUsage(rss, peak_rss, cpu_ticks / _CLOCK_TICKS)
+
+
+def block_resources(driver: webdriver.Chrome) -> None:
+    """Skip images, fonts and stylesheets in the current tab, the parsers only need the DOM."""
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(BLOCKED_URL_PATTERNS)})
+    except WebDriverException as err:
+        _LOGGER.debug("Could not block resources, loading full pages: %s", err)
+
+
+class SchulmanagerOnlineDriverManager:
+    """Keep a single Chrome WebDriver alive between scrapes.
+
+    Every call into the WebDriver runs on one dedicated worker thread, so
+    the blocking Selenium protocol never touches the event loop and calls
+    into the same browser are serialized.
+    """
+
+    def __init__(
+        self,
+        resolve_driver_path: Optional[Callable[[], Awaitable[str]]] = None,
+        max_memory_growth: int = DRIVER_MAX_MEMORY_GROWTH,
+        on_session_not_created: Optional[Callable[[], None]] = None,
+    ) -> None:
+        """Initialize the driver manager."""
+        self._resolve_driver_path = resolve_driver_path
+        self._on_session_not_created = on_session_not_created
+        self._max_memory_growth = max_memory_growth
+        self._driver: Optional[webdriver.Chrome] = None
+        self._baseline_rss: Optional[int] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def driver(self) -> Optional[webdriver.Chrome]:
+        """Return the current driver, if one is running."""
+        return self._driver
+
+    async def async_run(self, func: Callable[..., _T], *args: Any) -> _T:
+        """Run a blocking WebDriver call on the driver's worker thread."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="schulmanager_webdriver"
+            )
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    async def async_get_driver(self) -> webdriver.Chrome:
+        """Return a healthy driver, starting or recreating the browser if needed."""
+        async with self._lock:
+            if self._driver is not None:
+                if await self.async_run(self._is_healthy):
+                    return self._driver
+                await self.async_run(self._quit)
+
+            if self._resolve_driver_path is not None:
+                driver_path = await self._resolve_driver_path()
+            else:
+                driver_path = await self.async_run(ChromeDriverManager().install)
+
+            try:
+                await self.async_run(self._start, driver_path)
+            except SessionNotCreatedException:
+                # Usually a chromedriver that no longer matches an updated Chrome
+                if self._on_session_not_created is not None:
+                    self._on_session_not_created()
+                raise
+            return self._driver
+
+    async def async_close(self) -> None:
+        """Shut down the browser and its worker thread."""
+        async with self._lock:
+            if self._driver is not None:
+                await self.async_run(self._quit)
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+    def _start(self, driver_path: str) -> None:
+        """Start the browser and record its initial memory footprint."""
+        self._driver = self._create_driver(driver_path)
+        self._baseline_rss = self._get_rss()
+        _LOGGER.debug("Started Chrome WebDriver (rss=%s bytes)", self._baseline_rss)
+
+    def _create_driver(self, driver_path: str) -> webdriver.Chrome:
+        """Start a new headless Chrome instance."""
+        chrome_options = Options()
+        for argument in CHROME_ARGUMENTS:
+            chrome_options.add_argument(argument)
+
+        service = Service(driver_path)
+        driver = webdriver.Chrome(service=service, options=chrome_options)
+        driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+        block_resources(driver)
+        return driver
+
+    def _is_healthy(self) -> bool:
+        """Check that the browser still responds and has not grown too large."""
+        try:
+            # Any round trip to the browser fails once Chrome has crashed
+            self._driver.current_url  # pylint: disable=pointless-statement
+        except WebDriverException as err:
+            _LOGGER.info("Chrome WebDriver is no longer responsive, restarting: %s", err)
+            return False
+
+        rss = self._get_rss()
+        if rss is not None and self._baseline_rss is not None:
+            growth = rss - self._baseline_rss
+            if growth > self._max_memory_growth:
+                _LOGGER.info(
+                    "Chrome WebDriver memory grew by %d MB, restarting",
+                    growth // (1024 * 1024),
+                )
+                return False
+
+        return True
+
+    def _get_rss(self) -> Optional[int]:
+        """Return the resident memory of chromedriver and its browser processes."""
+        try:
+            return get_process_tree_rss(self._driver.service.process.pid)
+        except (AttributeError, OSError):
+            return None
+
+    def get_usage(self, reset_peak: bool = False) -> Optional[ProcessTreeUsage]:
+        """Return the resource usage of chromedriver and its browser processes."""
+        try:
+            return get_process_tree_usage(self._driver.service.process.pid, reset_peak)
+        except (AttributeError, OSError):
+            return None
+
+    def _quit(self) -> None:
+        """Quit the browser, ignoring errors from an already dead session."""
+        driver, self._driver = self._driver, None
+        self._baseline_rss = None
+        try:
+            driver.quit()
+        except Exception as err:  # pylint: disable=broad-except
+            _LOGGER.debug("Error while quitting Chrome WebDriver: %s", err)
+
+
+class BrowserContext(NamedTuple):
+    """An isolated browser context and the tab open in it."""
+
+    context_id: str
+    window: str
+
+
+class SchulmanagerOnlineBrowserPool:
+    """One Chrome instance shared by all config entries.
+
+    Every scraper gets its own browser context, so cookies and local
+    storage of different accounts stay apart. Scrapes from all entries
+    take turns in the one browser, which keeps the memory footprint of
+    several accounts close to that of one.
+    """
+
+    def __init__(
+        self,
+        resolver: Optional[ChromeDriverResolver] = None,
+        max_memory_growth: int = DRIVER_MAX_MEMORY_GROWTH,
+    ) -> None:
+        """Initialize the pool."""
+        self._resolver = resolver
+        self._owners: Dict[Any, Optional[str]] = {}
+        self.driver_manager = SchulmanagerOnlineDriverManager(
+            self._async_resolve_path if resolver is not None else None,
+            max_memory_growth,
+            on_session_not_created=resolver.invalidate if resolver is not None else None,
+        )
+        # Global scrape limiter: a scrape switches the browser to its own tab
+        self._lock = asyncio.Lock()
+        # The driver the contexts below live in, and the tab the browser started with
+        self._driver: Optional[webdriver.Chrome] = None
+        self._home_window: Optional[str] = None
+        self._contexts: Dict[Any, BrowserContext] = {}
+
+    def register(self, owner: Any, chromedriver_path: Optional[str] = None) -> None:
+        """Register a scraper using the pool, optionally with a pinned chromedriver."""
+        self._owners[owner] = chromedriver_path
+
+    def stagger_delay(self, owner: Any) -> float:
+        """Return how long the first scrape of an owner should wait to spread out start-up."""
+        return list(self._owners).index(owner) * SCRAPE_STAGGER
+
+    async def _async_resolve_path(self) -> str:
+        """Resolve the chromedriver, preferring a path pinned by any registered owner."""
+        pinned = next((path for path in self._owners.values() if path), None)
+        return await self._resolver.async_get_path(pinned)
+
+    @asynccontextmanager
+    async def async_session(self, owner: Any) -> AsyncIterator[Tuple[webdriver.Chrome, bool]]:
+        """Hold the browser with the owner's context selected.
+
+        Yields the driver and whether the context is new, i.e. has no cookies yet.
+        """
+        async with self._lock:
+            driver = await self.driver_manager.async_get_driver()
+            if driver is not self._driver:
+                # A new browser, contexts of the previous one are gone
+                self._driver = driver
+                self._home_window = await self.driver_manager.async_run(
+                    lambda: driver.current_window_handle
+                )
+                self._contexts.clear()
+
+            context = self._contexts.get(owner)
+            if context is None:
+                context = await self.driver_manager.async_run(self._create_context, driver)
+                self._contexts[owner] = context
+                yield driver, True
+            else:
+                await self.driver_manager.async_run(driver.switch_to.window, context.window)
+                yield driver, False
+
+    async def async_release(self, owner: Any) -> None:
+        """Drop the owner's context, and shut down the browser once nobody uses it."""
+        async with self._lock:
+            self._owners.pop(owner, None)
+            context = self._contexts.pop(owner, None)
+            if self._owners:
+                if context is not None and self._driver is not None:
+                    await self.driver_manager.async_run(self._dispose_context, context)
+                return
+
+            self._driver = None
+            self._contexts.clear()
+            await self.driver_manager.async_close()
+
+    def _create_context(self, driver: webdriver.Chrome) -> BrowserContext:
+        """Open a tab in a new isolated browser context and select it."""
+        context_id = driver.execute_cdp_cmd("Target.createBrowserContext", {})["browserContextId"]
+        window = driver.execute_cdp_cmd(
+            "Target.createTarget", {"url": "about:blank", "browserContextId": context_id}
+        )["targetId"]
+        driver.switch_to.window(window)
+        block_resources(driver)
+        return BrowserContext(context_id, window)
+
+    def _dispose_context(self, context: BrowserContext) -> None:
+        """Close a context with its tab, returning to the browser's first tab."""
+        try:
+            self._driver.switch_to.window(self._home_window)
+            self._driver.execute_cdp_cmd(
+                "Target.disposeBrowserContext", {"browserContextId": context.context_id}
+            )
+        except WebDriverException as err:
+            _LOGGER.debug("Could not dispose browser context: %s", err)
+
+
+def async_get_browser_pool(hass: HomeAssistant) -> SchulmanagerOnlineBrowserPool:
+    """Return the browser pool shared by all config entries."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if DATA_BROWSER_POOL not in domain_data:
+        domain_data[DATA_BROWSER_POOL] = SchulmanagerOnlineBrowserPool(
+            async_get_chromedriver_resolver(hass)
+        )
+    return domain_data[DATA_BROWSER_POOL]
@@ -0,0 +1,12 @@
+"""Exceptions of the Schulmanager Online scraping backend.
+
+They live apart from the scraper, so catching them does not import Selenium.
+"""
+
+
+class SchulmanagerOnlineScraperError(Exception):
+    """Exception to indicate a general scraper error."""
+
+
+class SchulmanagerOnlineScraperAuthError(Exception):
+    """Exception to indicate an authentication error."""
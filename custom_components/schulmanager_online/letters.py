@@ -0,0 +1,100 @@
+"""Local index of the letters of an account."""
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, LETTERS_SAVE_DELAY, LETTERS_STORAGE_VERSION
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class SchulmanagerOnlineLettersIndex:
+    """Letters keyed by id and persisted in Home Assistant storage.
+
+    Fetched letters are merged in a single pass, and the unread and total
+    counts are adjusted for the letters that changed instead of being
+    recounted over the whole list.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the index."""
+        self._store: Store = Store(
+            hass, LETTERS_STORAGE_VERSION, f"{DOMAIN}.{entry_id}.letters"
+        )
+        self._letters: Dict[Any, Dict[str, Any]] = {}
+        self._sorted: Optional[List[Dict[str, Any]]] = None
+        self._loaded = False
+        self.unread_count = 0
+
+    @property
+    def total_count(self) -> int:
+        """Return the number of letters."""
+        return len(self._letters)
+
+    @property
+    def letters(self) -> List[Dict[str, Any]]:
+        """Return the letters, newest first."""
+        if self._sorted is None:
+            self._sorted = sorted(
+                self._letters.values(),
+                key=lambda letter: letter.get("created_at") or "",
+                reverse=True,
+            )
+        return self._sorted
+
+    async def async_load(self) -> None:
+        """Load the index from storage, once."""
+        if self._loaded:
+            return
+        self._loaded = True
+
+        stored = await self._store.async_load()
+        if stored:
+            self._letters = {letter["id"]: letter for letter in stored.get("letters", [])}
+            self.unread_count = sum(1 for letter in self._letters.values() if not letter["read"])
+            self._sorted = None
+
+    @callback
+    def async_merge(self, letters: Iterable[Dict[str, Any]]) -> bool:
+        """Merge the letters currently on the server into the index.
+
+        Returns whether anything changed.
+        """
+        changed = False
+        seen = set()
+
+        for letter in letters:
+            letter_id = letter["id"]
+            seen.add(letter_id)
+            known = self._letters.get(letter_id)
+            if known == letter:
+                continue
+
+            if known is None:
+                self.unread_count += not letter["read"]
+            else:
+                self.unread_count += known["read"] - letter["read"]
+            self._letters[letter_id] = letter
+            changed = True
+
+        # Letters the school has withdrawn
+        if len(seen) != len(self._letters):
+            for letter_id in [letter_id for letter_id in self._letters if letter_id not in seen]:
+                self.unread_count -= not self._letters.pop(letter_id)["read"]
+            changed = True
+
+        if changed:
+            self._sorted = None
+            self._store.async_delay_save(self._data_to_save, LETTERS_SAVE_DELAY)
+        return changed
+
+    @callback
+    def _data_to_save(self) -> Dict[str, Any]:
+        """Return the data to store."""
+        return {"letters": list(self._letters.values())}
+
+    async def async_remove(self) -> None:
+        """Remove the stored index."""
+        await self._store.async_remove()
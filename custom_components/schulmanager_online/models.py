@@ -0,0 +1,155 @@
+"""Data models for Schulmanager Online."""
+from enum import Enum
+from typing import Any, Dict, Iterator, List, Optional
+
+
+class LessonStatus(str, Enum):
+    """Status of a lesson in the timetable."""
+
+    REGULAR = "regular"
+    CANCELLED = "cancelled"
+    SUBSTITUTED = "substituted"
+
+
+class Lesson:
+    """A single lesson of the timetable."""
+
+    __slots__ = ("period", "subject", "teacher", "room", "status", "original")
+
+    def __init__(
+        self,
+        period: int,
+        subject: str = "",
+        teacher: str = "",
+        room: str = "",
+        status: LessonStatus = LessonStatus.REGULAR,
+        original: Optional[str] = None,
+    ) -> None:
+        """Initialize the lesson."""
+        self.period = period
+        self.subject = subject
+        self.teacher = teacher
+        self.room = room
+        self.status = status
+        # What a substituted lesson replaced, as shown in the timetable
+        self.original = original
+
+    def __eq__(self, other: object) -> bool:
+        """Compare lessons by value."""
+        if not isinstance(other, Lesson):
+            return NotImplemented
+        return all(getattr(self, slot) == getattr(other, slot) for slot in self.__slots__)
+
+    def __repr__(self) -> str:
+        """Return a debug representation."""
+        return f"Lesson({self.period}, {self.render()!r}, {self.status.value})"
+
+    def render(self) -> str:
+        """Return the lesson as a display string."""
+        if self.status is LessonStatus.CANCELLED:
+            return f"<del>{self.subject}</del>"
+        details = f"{self.subject} {self.teacher} {self.room}".strip()
+        if self.status is LessonStatus.SUBSTITUTED and self.original:
+            return f"{self.original} → {details}"
+        return details
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the lesson as a JSON-serializable dict."""
+        return {
+            "period": self.period,
+            "subject": self.subject,
+            "teacher": self.teacher,
+            "room": self.room,
+            "status": self.status.value,
+            "original": self.original,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Lesson":
+        """Create a lesson from as_dict() output."""
+        return cls(
+            data["period"],
+            data.get("subject", ""),
+            data.get("teacher", ""),
+            data.get("room", ""),
+            LessonStatus(data.get("status", LessonStatus.REGULAR.value)),
+            data.get("original"),
+        )
+
+
+class TimetableWeek:
+    """The lessons of one week as a compact grid of weekdays by periods.
+
+    Strings for display are only rendered on request.
+    """
+
+    __slots__ = ("periods", "first_period", "_cells")
+
+    def __init__(self, periods: int = 0, first_period: int = 1) -> None:
+        """Initialize an empty week (Monday to Sunday) of periods from first_period on.
+
+        Schools with a "0. Stunde" start at period 0.
+        """
+        self.periods = periods
+        self.first_period = first_period
+        self._cells: List[Optional[Lesson]] = [None] * (7 * periods)
+
+    def __bool__(self) -> bool:
+        """Return whether the week has any lesson."""
+        return any(self._cells)
+
+    def __eq__(self, other: object) -> bool:
+        """Compare weeks by value."""
+        if not isinstance(other, TimetableWeek):
+            return NotImplemented
+        return (
+            self.periods == other.periods
+            and self.first_period == other.first_period
+            and self._cells == other._cells
+        )
+
+    def set(self, weekday: int, period: int, lesson: Optional[Lesson]) -> None:
+        """Set the lesson of a weekday (0 = Monday) and period."""
+        index = period - self.first_period
+        if not 0 <= weekday < 7 or not 0 <= index < self.periods:
+            raise ValueError(f"No period {period} on weekday {weekday} in this week")
+        self._cells[weekday * self.periods + index] = lesson
+
+    def day(self, weekday: int) -> List[Optional[Lesson]]:
+        """Return the lessons of a weekday, None for free periods."""
+        start = weekday * self.periods
+        return self._cells[start:start + self.periods]
+
+    def days(self) -> Iterator[List[Optional[Lesson]]]:
+        """Iterate over the days from Monday to Sunday."""
+        for weekday in range(7):
+            yield self.day(weekday)
+
+    def days_with_lessons(self) -> int:
+        """Return the number of days with at least one lesson."""
+        return sum(1 for day in self.days() if any(day))
+
+    def render_day(self, weekday: int) -> List[str]:
+        """Return the lessons of a weekday as display strings."""
+        return [lesson.render() if lesson else "" for lesson in self.day(weekday)]
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the week as a JSON-serializable dict."""
+        return {
+            "periods": self.periods,
+            "first_period": self.first_period,
+            "days": [
+                [lesson.as_dict() if lesson else None for lesson in day]
+                for day in self.days()
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TimetableWeek":
+        """Create a week from as_dict() output."""
+        week = cls(data.get("periods", 0), data.get("first_period", 1))
+        for weekday, day in enumerate(data.get("days", [])):
+            for period, lesson in enumerate(day, start=week.first_period):
+                if lesson:
+                    week.set(weekday, period, Lesson.from_dict(lesson))
+        return week
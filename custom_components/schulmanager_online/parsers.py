@@ -0,0 +1,438 @@
+"""HTML parsers for the pages scraped from Schulmanager Online."""
+from dataclasses import dataclass
+from datetime import date
+from html.parser import HTMLParser
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from .models import Lesson, LessonStatus, TimetableWeek
+
+# Elements without an end tag, they must not change the nesting depth
+_VOID_ELEMENTS = frozenset(
+    {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+)
+
+_DATE_RE = re.compile(r"(\d{1,2})\.(\d{1,2})\.(\d{4})")
+# Exam dates on the dashboard usually omit the year, e.g. "Mo., 15.01."
+_SHORT_DATE_RE = re.compile(r"(\d{1,2})\.(\d{1,2})\.(\d{4})?")
+_TIME_RANGE_RE = re.compile(r"(\d{1,2}:\d{2})(?:\s*-\s*(\d{1,2}:\d{2}))?")
+
+
+def _has_class(attrs: List[Tuple[str, Optional[str]]], name: str) -> bool:
+    """Return whether the attributes of a tag include the CSS class name."""
+    for key, value in attrs:
+        if key == "class" and value:
+            return name in value.split()
+    return False
+
+
+def _collapse(parts: List[str]) -> str:
+    """Join text fragments and collapse whitespace."""
+    return " ".join("".join(parts).split())
+
+
+@dataclass(frozen=True, slots=True)
+class HomeworkRecord:
+    """A homework task for one subject on one day."""
+
+    date: str
+    subject: str
+    task: str
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the record in the format exposed by the sensors."""
+        return {
+            "date": self.date,
+            "subject": self.subject,
+            "task": self.task,
+            "description": f"{self.subject}: {self.task}",
+        }
+
+
+class _HomeworkParser(HTMLParser):
+    """Single-pass parser for the homework page.
+
+    Only the content of `.tile` elements is looked at. Each tile holds a
+    date followed by an `<h4>` per subject, and the text of all `<span>`
+    elements up to the next `<h4>` is the task of that subject.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the parser."""
+        super().__init__(convert_charrefs=True)
+        self.records: List[HomeworkRecord] = []
+        self._depth = 0  # nesting depth inside the current tile, 0 outside of tiles
+        self._date: Optional[str] = None
+        self._subject: Optional[str] = None
+        self._tasks: List[str] = []
+        self._capture: Optional[str] = None
+        self._capture_depth = 0
+        self._text: List[str] = []
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        """Track tiles, subjects and tasks."""
+        if not self._depth:
+            if _has_class(attrs, "tile"):
+                self._depth = 1
+                self._date = None
+                self._subject = None
+                self._tasks = []
+            return
+
+        if tag in _VOID_ELEMENTS:
+            if tag == "br" and self._capture is not None:
+                self._text.append(" ")
+            return
+        self._depth += 1
+
+        if self._capture is not None:
+            return
+        if tag == "h4":
+            self._finish_subject()
+            self._start_capture(tag)
+        elif tag == "span" and self._subject is not None:
+            self._start_capture(tag)
+
+    def handle_endtag(self, tag: str) -> None:
+        """Close captured elements and tiles."""
+        if not self._depth or tag in _VOID_ELEMENTS:
+            return
+
+        if self._capture is not None and self._depth == self._capture_depth:
+            text = _collapse(self._text)
+            if self._capture == "h4":
+                self._subject = text
+                self._tasks = []
+            elif text:
+                self._tasks.append(text)
+            self._capture = None
+
+        self._depth -= 1
+        if not self._depth:
+            self._finish_subject()
+
+    def handle_data(self, data: str) -> None:
+        """Collect captured text and the date of the tile."""
+        if not self._depth:
+            return
+        if self._capture is not None:
+            self._text.append(data)
+        elif self._date is None and (match := _DATE_RE.search(data)):
+            day, month, year = match.groups()
+            self._date = f"{year}-{month.zfill(2)}-{day.zfill(2)}"
+
+    def _start_capture(self, tag: str) -> None:
+        """Start collecting the text of an element."""
+        self._capture = tag
+        self._capture_depth = self._depth
+        self._text = []
+
+    def _finish_subject(self) -> None:
+        """Emit a record for the current subject, if it has a task."""
+        if self._date and self._subject and self._tasks:
+            self.records.append(HomeworkRecord(self._date, self._subject, " ".join(self._tasks)))
+        self._subject = None
+        self._tasks = []
+
+
+def parse_homework(html: str) -> List[HomeworkRecord]:
+    """Parse the homework tiles of the homework page."""
+    parser = _HomeworkParser()
+    parser.feed(html)
+    parser.close()
+    return parser.records
+
+
+def infer_date(day: int, month: int, today: date) -> date:
+    """Return the date closest to today for a day and month without a year.
+
+    Scraping in December finds January exams in the next year, scraping in
+    January finds December exams in the previous one. Years in which the
+    day does not exist, e.g. a 29.02. outside leap years, are skipped.
+    """
+    candidates = []
+    for year in (today.year, today.year + 1, today.year - 1):
+        try:
+            candidates.append(date(year, month, day))
+        except ValueError:
+            continue
+    if not candidates:
+        raise ValueError(f"No valid date for {day}.{month}.")
+    return min(candidates, key=lambda candidate: abs(candidate - today))
+
+
+@dataclass(frozen=True, slots=True)
+class ExamRecord:
+    """An exam listed on the dashboard."""
+
+    date: str
+    subject: str
+    time: str
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the record in the format exposed by the sensors."""
+        return {
+            "date": self.date,
+            "subject": self.subject,
+            "time": self.time,
+            "description": f"{self.time} {self.subject}",
+        }
+
+
+class _ExamTableParser(HTMLParser):
+    """Single-pass parser for the exam table on the dashboard.
+
+    Only the first `<table>` is looked at. In each row the `<strong>`
+    element holds the subject, and the cells after it hold the date and
+    the begin and end time.
+    """
+
+    def __init__(self, today: date) -> None:
+        """Initialize the parser."""
+        super().__init__(convert_charrefs=True)
+        self.records: List[ExamRecord] = []
+        self._today = today
+        self._table_depth = 0
+        self._done = False
+        self._in_row = False
+        self._cells: List[List[str]] = []
+        self._subject: Optional[str] = None
+        self._subject_cell = -1
+        self._in_strong = False
+        self._strong_text: List[str] = []
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        """Track the table, its rows, cells and subjects."""
+        if self._done:
+            return
+        if tag == "table":
+            self._table_depth += 1
+        elif not self._table_depth:
+            return
+        elif tag == "tr":
+            self._in_row = True
+            self._cells = []
+            self._subject = None
+            self._subject_cell = -1
+        elif tag in ("td", "th") and self._in_row:
+            self._cells.append([])
+        elif tag == "br" and self._cells:
+            self._cells[-1].append(" ")
+        elif tag == "strong" and self._cells and self._subject is None:
+            self._in_strong = True
+            self._strong_text = []
+
+    def handle_endtag(self, tag: str) -> None:
+        """Finish subjects, rows and the table."""
+        if self._done or not self._table_depth:
+            return
+        if tag == "strong" and self._in_strong:
+            self._in_strong = False
+            self._subject = _collapse(self._strong_text) or None
+            self._subject_cell = len(self._cells) - 1
+        elif tag == "tr" and self._in_row:
+            self._in_row = False
+            self._finish_row()
+        elif tag == "table":
+            self._table_depth -= 1
+            self._done = not self._table_depth
+
+    def handle_data(self, data: str) -> None:
+        """Collect the text of the current cell."""
+        if not self._cells or not self._in_row:
+            return
+        if self._in_strong:
+            self._strong_text.append(data)
+        else:
+            self._cells[-1].append(data)
+
+    def _finish_row(self) -> None:
+        """Emit a record for the row, if it describes an exam."""
+        if self._subject is None:
+            return
+
+        text = " ".join("".join(cell) for cell in self._cells[self._subject_cell + 1:])
+        if not (date_match := _SHORT_DATE_RE.search(text)):
+            return
+
+        day, month, year = date_match.groups()
+        try:
+            if year:
+                exam_date = date(int(year), int(month), int(day))
+            else:
+                exam_date = infer_date(int(day), int(month), self._today)
+        except ValueError:
+            return
+
+        exam_time = ""
+        if time_match := _TIME_RANGE_RE.search(text, date_match.end()):
+            begin, end = time_match.groups()
+            exam_time = f"{begin} - {end}" if end else begin
+
+        self.records.append(ExamRecord(exam_date.isoformat(), self._subject, exam_time))
+
+
+def parse_exams(html: str, today: Optional[date] = None) -> List[ExamRecord]:
+    """Parse the exam table of the dashboard."""
+    parser = _ExamTableParser(today or date.today())
+    parser.feed(html)
+    parser.close()
+    return parser.records
+
+
+_REGION_CLASSES = ("timetable-left", "timetable-right", "timetable-bottom")
+
+
+class _TimetableParser(HTMLParser):
+    """Single-pass parser for the week table of the schedules page.
+
+    Each body row is a period; its first cell holds the time and the next
+    seven cells hold the lessons from Monday to Sunday. A lesson cell has
+    the subject in `.timetable-left`, the teacher in `.timetable-right` and
+    the room in `.timetable-bottom`. Cancelled lessons are marked with
+    `.lesson-cell.cancelled`, substitutions show the old lesson in red and
+    the new one in green.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the parser."""
+        super().__init__(convert_charrefs=True)
+        self.rows: List[List[Optional[Lesson]]] = []
+        self._table_depth = 0
+        self._done = False
+        self._in_head = False
+        self._row: Optional[List[Optional[Lesson]]] = None
+        self._cell_index = -1
+        # Open elements of the current cell as (tag, marker) pairs
+        self._stack: List[Tuple[str, Optional[str]]] = []
+        self._texts: Dict[str, List[str]] = {}
+        self._cancelled = False
+        self._has_span = False
+        self._has_inter = False
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        """Track rows, cells and the marked regions within a cell."""
+        if self._done:
+            return
+        if tag == "table":
+            self._table_depth += 1
+            return
+        if not self._table_depth:
+            return
+
+        if tag == "thead":
+            self._in_head = True
+        elif tag == "tr" and not self._in_head:
+            self._row = []
+            self._cell_index = -1
+        elif tag == "td" and self._row is not None and not self._stack:
+            self._cell_index += 1
+            self._texts = {}
+            self._cancelled = False
+            self._has_span = False
+            self._has_inter = False
+            self._stack.append((tag, None))
+        elif self._stack and tag not in _VOID_ELEMENTS:
+            self._stack.append((tag, self._marker(tag, attrs)))
+
+    def _marker(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> Optional[str]:
+        """Return the region or color an element of a lesson cell marks."""
+        marker = None
+        for key, value in attrs:
+            if not value:
+                continue
+            if key == "class":
+                classes = value.split()
+                if "lesson-cell" in classes and "cancelled" in classes:
+                    self._cancelled = True
+                for region in _REGION_CLASSES:
+                    if region in classes:
+                        marker = region
+            elif key == "style" and tag == "span":
+                if "Inter" in value:
+                    self._has_inter = True
+                if "color" in value:
+                    if "red" in value:
+                        marker = "red"
+                    elif "green" in value:
+                        marker = "green"
+        if tag == "span":
+            self._has_span = True
+        return marker
+
+    def handle_endtag(self, tag: str) -> None:
+        """Close cells, rows and the table."""
+        if self._done or not self._table_depth:
+            return
+        if self._stack and tag not in _VOID_ELEMENTS:
+            # Pop up to the matching element, tolerating unclosed children
+            while self._stack:
+                open_tag, _ = self._stack.pop()
+                if open_tag == tag:
+                    break
+            if not self._stack and tag == "td":
+                self._finish_cell()
+            return
+
+        if tag == "thead":
+            self._in_head = False
+        elif tag == "tr" and self._row is not None:
+            if self._cell_index > 0:
+                self.rows.append(self._row)
+            self._row = None
+        elif tag == "table":
+            self._table_depth -= 1
+            self._done = not self._table_depth
+
+    def handle_data(self, data: str) -> None:
+        """Collect the text of every marked region of the current cell."""
+        if not self._stack:
+            return
+        for _, marker in reversed(self._stack):
+            if marker is not None:
+                self._texts.setdefault(marker, []).append(data)
+                return
+
+    def _finish_cell(self) -> None:
+        """Turn the collected cell content into a lesson."""
+        # The first cell of a row holds the time of the period
+        if self._cell_index == 0 or self._cell_index > 7:
+            return
+
+        period = len(self.rows) + 1
+        texts = {marker: _collapse(parts) for marker, parts in self._texts.items()}
+        lesson = None
+        if not self._has_span:
+            pass  # free period
+        elif self._cancelled:
+            lesson = Lesson(
+                period, texts.get("timetable-left", ""), status=LessonStatus.CANCELLED
+            )
+        elif "red" in texts and "green" in texts and not self._has_inter:
+            lesson = Lesson(
+                period,
+                texts["green"],
+                status=LessonStatus.SUBSTITUTED,
+                original=texts["red"],
+            )
+        elif texts.get("timetable-left"):
+            lesson = Lesson(
+                period,
+                texts["timetable-left"],
+                texts.get("timetable-right", ""),
+                texts.get("timetable-bottom", ""),
+            )
+        self._row.append(lesson)
+
+
+def parse_timetable(html: str) -> TimetableWeek:
+    """Parse the week table of the schedules page."""
+    parser = _TimetableParser()
+    parser.feed(html)
+    parser.close()
+
+    week = TimetableWeek(len(parser.rows))
+    for period, row in enumerate(parser.rows, start=1):
+        for weekday, lesson in enumerate(row[:7]):
+            week.set(weekday, period, lesson)
+    return week
@@ -0,0 +1,117 @@
+"""Page readiness detection for the Schulmanager Online web scraper."""
+import logging
+import time
+from typing import Dict, Optional
+
+from selenium import webdriver
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.support.ui import WebDriverWait
+
+from .const import (
+    READINESS_MAX_TIMEOUT,
+    READINESS_MIN_TIMEOUT,
+    READINESS_POLL_INTERVAL,
+    READINESS_TIMEOUT_FACTOR,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Counts the XHR and fetch requests in flight, installed into every new document
+REQUEST_TRACKER_SCRIPT = """
+(() => {
+  if (window.__smPending !== undefined) return;
+  window.__smPending = 0;
+  const done = () => { window.__smPending = Math.max(0, window.__smPending - 1); };
+  const send = XMLHttpRequest.prototype.send;
+  XMLHttpRequest.prototype.send = function (...args) {
+    window.__smPending++;
+    this.addEventListener("loadend", done, { once: true });
+    return send.apply(this, args);
+  };
+  const fetch = window.fetch;
+  window.fetch = function (...args) {
+    window.__smPending++;
+    return fetch.apply(this, args).finally(done);
+  };
+})();
+"""
+
+# True once the selector matched and the page has settled: the document is
+# loaded, no request is in flight and Angular reports no pending work
+READY_PROBE_SCRIPT = """
+const selector = arguments[0];
+if (document.readyState !== "complete") return false;
+if (selector && !document.querySelector(selector)) return false;
+if ((window.__smPending || 0) > 0) return false;
+if (window.getAllAngularTestabilities) {
+  return window.getAllAngularTestabilities().every((testability) => testability.isStable());
+}
+return true;
+"""
+
+
+def install_request_tracker(driver: webdriver.Chrome) -> None:
+    """Track pending requests in every document the browser loads from now on."""
+    try:
+        driver.execute_cdp_cmd(
+            "Page.addScriptToEvaluateOnNewDocument", {"source": REQUEST_TRACKER_SCRIPT}
+        )
+    except WebDriverException as err:
+        # Without the tracker the probe still waits for the selector and Angular
+        _LOGGER.debug("Could not install the request tracker: %s", err)
+
+
+class PageReadiness:
+    """Waits for pages to be ready, with timeouts adapted to observed load times.
+
+    The timeout of a step is a multiple of its smoothed recent load time,
+    kept between a lower and an upper bound. Steps not seen yet get the
+    upper bound.
+    """
+
+    def __init__(self, smoothing: float = 0.3) -> None:
+        """Initialize."""
+        self._smoothing = smoothing
+        self._load_times: Dict[str, float] = {}
+
+    def timeout(self, step: str) -> float:
+        """Return the current timeout of a step in seconds."""
+        load_time = self._load_times.get(step)
+        if load_time is None:
+            return READINESS_MAX_TIMEOUT
+        return min(
+            READINESS_MAX_TIMEOUT,
+            max(READINESS_MIN_TIMEOUT, load_time * READINESS_TIMEOUT_FACTOR),
+        )
+
+    def _observe(self, step: str, seconds: float) -> None:
+        """Record the load time of a step."""
+        previous = self._load_times.get(step)
+        if previous is None:
+            self._load_times[step] = seconds
+        else:
+            self._load_times[step] = previous + self._smoothing * (seconds - previous)
+
+    def wait(
+        self, driver: webdriver.Chrome, step: str, selector: Optional[str] = None
+    ) -> bool:
+        """Wait until the selector matched and the page settled.
+
+        Returns False if the page did not get ready within the step's timeout.
+        """
+        timeout = self.timeout(step)
+        started = time.monotonic()
+        try:
+            WebDriverWait(driver, timeout, poll_frequency=READINESS_POLL_INTERVAL).until(
+                lambda d: d.execute_script(READY_PROBE_SCRIPT, selector)
+            )
+        except TimeoutException:
+            # Count the timeout as the load time, so a slow school server gets more time
+            self._observe(step, timeout)
+            _LOGGER.debug("%s was not ready after %.1f s", step, timeout)
+            return False
+
+        elapsed = time.monotonic() - started
+        self._observe(step, elapsed)
+        _LOGGER.debug("%s was ready after %.2f s", step, elapsed)
+        return True
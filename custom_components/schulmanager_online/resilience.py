@@ -0,0 +1,135 @@
+"""Retries and circuit breaking for the Schulmanager Online backends."""
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Type, TypeVar
+
+from .const import (
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_MAX_RESET_TIMEOUT,
+    BREAKER_RESET_TIMEOUT,
+    RETRY_ATTEMPTS,
+    RETRY_BASE_DELAY,
+    RETRY_MAX_DELAY,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+def backoff_delay(
+    attempt: int, base: float = RETRY_BASE_DELAY, cap: float = RETRY_MAX_DELAY
+) -> float:
+    """Return a random delay up to an exponentially growing bound ("full jitter")."""
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+async def async_retry(
+    func: Callable[[], Awaitable[_T]],
+    retry_on: Tuple[Type[BaseException], ...],
+    attempts: int = RETRY_ATTEMPTS,
+) -> _T:
+    """Await func, retrying errors of the given types with jittered exponential backoff."""
+    attempt = 0
+    while True:
+        try:
+            return await func()
+        except retry_on as err:
+            attempt += 1
+            if attempt >= attempts:
+                raise
+            delay = backoff_delay(attempt - 1)
+            _LOGGER.debug("Attempt %d failed, retrying in %.1f s: %s", attempt, delay, err)
+            await asyncio.sleep(delay)
+
+
+class CircuitBreaker:
+    """Stop calling a failing backend for a while.
+
+    After a number of consecutive failures the breaker opens and requests
+    are refused without being tried. Once the reset timeout passed, one
+    trial request is let through: success closes the breaker, failure
+    opens it again with twice the timeout, up to a maximum. Until the
+    trial reports back, further requests are refused for another reset
+    timeout, which also lets a new trial through if this one never does.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        reset_timeout: float = BREAKER_RESET_TIMEOUT,
+        max_reset_timeout: float = BREAKER_MAX_RESET_TIMEOUT,
+    ) -> None:
+        """Initialize a closed breaker."""
+        self.name = name
+        self._failure_threshold = failure_threshold
+        self._base_reset_timeout = reset_timeout
+        self._max_reset_timeout = max_reset_timeout
+        self._reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._last_error: Optional[str] = None
+
+    @property
+    def state(self) -> str:
+        """Return the state of the breaker."""
+        if self._opened_at is None:
+            return STATE_CLOSED
+        if time.monotonic() - self._opened_at >= self._reset_timeout:
+            return STATE_HALF_OPEN
+        return STATE_OPEN
+
+    def allow_request(self) -> bool:
+        """Return whether a request may be made now, counting it as the trial if half open."""
+        state = self.state
+        if state == STATE_HALF_OPEN:
+            # Keep everybody else out while the trial runs
+            self._opened_at = time.monotonic()
+            return True
+        return state == STATE_CLOSED
+
+    def record_success(self) -> None:
+        """Close the breaker after a successful request."""
+        if self._opened_at is not None:
+            _LOGGER.info("%s is reachable again", self.name)
+        self._failures = 0
+        self._opened_at = None
+        self._reset_timeout = self._base_reset_timeout
+
+    def record_failure(self, err: BaseException) -> None:
+        """Count a failed request, opening the breaker when there were too many."""
+        self._failures += 1
+        self._last_error = str(err)
+        if self._opened_at is not None:
+            # The trial request failed, wait longer before the next one
+            self._reset_timeout = min(self._reset_timeout * 2, self._max_reset_timeout)
+            self._opened_at = time.monotonic()
+        elif self._failures >= self._failure_threshold:
+            _LOGGER.warning(
+                "%s failed %d times in a row, pausing requests for %d s: %s",
+                self.name,
+                self._failures,
+                self._reset_timeout,
+                err,
+            )
+            self._opened_at = time.monotonic()
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the state of the breaker for diagnostics."""
+        retry_in = None
+        if self._opened_at is not None:
+            retry_in = max(0.0, self._opened_at + self._reset_timeout - time.monotonic())
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "reset_timeout": self._reset_timeout,
+            "retry_in": retry_in,
+            "last_error": self._last_error,
+        }
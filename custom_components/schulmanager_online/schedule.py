@@ -0,0 +1,91 @@
+"""Schedule-aware polling intervals for Schulmanager Online."""
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    CONF_ACTIVE_SCAN_INTERVAL,
+    CONF_IDLE_SCAN_INTERVAL,
+    DEFAULT_ACTIVE_SCAN_INTERVAL,
+    DEFAULT_IDLE_SCAN_INTERVAL,
+    SCHOOL_DAY_ACTIVE_HOURS,
+)
+from .models import TimetableWeek
+
+# Never schedule the next poll sooner than this, e.g. right before a school day starts
+_MIN_INTERVAL = timedelta(minutes=1)
+# How far ahead to look for the next school day
+_LOOKAHEAD_DAYS = 14
+
+
+class SchulmanagerOnlinePollingSchedule:
+    """Decides how often homework, exams, the timetable and appointments are polled.
+
+    Substitutions and homework appear on school days, so sources are
+    polled at their own interval (but not more often than the configured
+    active interval) during the active hours of a school day, and at the
+    idle interval otherwise. The idle interval is shortened so the next
+    school day starts on time.
+
+    A day counts as a school day if the fetched timetable has a lesson on
+    it. Days the timetable does not cover fall back to Monday to Friday.
+    """
+
+    def __init__(self, options: Optional[Mapping[str, Any]] = None) -> None:
+        """Initialize the schedule."""
+        options = options or {}
+        self._active_interval = timedelta(
+            minutes=options.get(CONF_ACTIVE_SCAN_INTERVAL, DEFAULT_ACTIVE_SCAN_INTERVAL)
+        )
+        self._idle_interval = timedelta(
+            minutes=options.get(CONF_IDLE_SCAN_INTERVAL, DEFAULT_IDLE_SCAN_INTERVAL)
+        )
+        self._school_days: Dict[date, bool] = {}
+
+    def update_timetable(self, weeks: Mapping[str, TimetableWeek]) -> None:
+        """Learn the school days from the timetable weeks, keyed by ISO week."""
+        school_days = {}
+        for key, week in weeks.items():
+            year, week_number = key.split("-W")
+            monday = date.fromisocalendar(int(year), int(week_number), 1)
+            for weekday, day in enumerate(week.days()):
+                school_days[monday + timedelta(days=weekday)] = any(day)
+        self._school_days = school_days
+
+    def is_school_day(self, day: date) -> bool:
+        """Return whether there are lessons on a day."""
+        known = self._school_days.get(day)
+        return known if known is not None else day.weekday() < 5
+
+    def _active_window(self, day: date) -> Tuple[datetime, datetime]:
+        """Return the start and end of the active hours of a day."""
+        start = dt_util.start_of_local_day(day)
+        return (
+            start + timedelta(hours=SCHOOL_DAY_ACTIVE_HOURS[0]),
+            start + timedelta(hours=SCHOOL_DAY_ACTIVE_HOURS[1]),
+        )
+
+    def _next_active_start(self, now: datetime) -> Optional[datetime]:
+        """Return when the active hours of the next school day start."""
+        for offset in range(_LOOKAHEAD_DAYS + 1):
+            day = now.date() + timedelta(days=offset)
+            if not self.is_school_day(day):
+                continue
+            start, _ = self._active_window(day)
+            if start > now:
+                return start
+        return None
+
+    def interval(self, scan_interval: timedelta, now: Optional[datetime] = None) -> timedelta:
+        """Return the interval until the next poll of a source."""
+        now = now or dt_util.now()
+        if self.is_school_day(now.date()):
+            start, end = self._active_window(now.date())
+            if start <= now < end:
+                return max(scan_interval, self._active_interval)
+
+        interval = max(scan_interval, self._idle_interval)
+        if (next_start := self._next_active_start(now)) is not None:
+            interval = max(min(interval, next_start - now), _MIN_INTERVAL)
+        return interval
@@ -2,82 +2,101 @@
 """Web scraper for Schulmanager Online."""
 import asyncio
 import logging
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+import time
+from typing import Any, Callable, Dict, List, Optional, TypeVar
 
 from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
-from webdriver_manager.chrome import ChromeDriverManager
 
-from .const import HOMEWORK_URL, LOGIN_URL, SCHEDULES_URL
+from .const import BASE_URL, DASHBOARD_URL, HOMEWORK_URL, LOGIN_URL, SCHEDULES_URL
+from .driver import ProcessTreeUsage, SchulmanagerOnlineBrowserPool
+from .exceptions import SchulmanagerOnlineScraperAuthError, SchulmanagerOnlineScraperError
+from .models import TimetableWeek
+from .parsers import parse_exams, parse_homework, parse_timetable
+from .readiness import PageReadiness, install_request_tracker
+from .resilience import CircuitBreaker, async_retry
+from .session import SchulmanagerOnlineSessionStore
 
 _LOGGER = logging.getLogger(__name__)
 
+_T = TypeVar("_T")
 
-class SchulmanagerOnlineScraperError(Exception):
-    """Exception to indicate a general scraper error."""
+_ACCOUNT_MENU = "#accountDropdown"
+_LOGIN_FORM = "#emailOrUsername"
+_LOGIN_ERROR = ".alert-danger"
 
+# Returns the outerHTML of the matching containers only, instead of the whole
+# serialized page, or null if the page does not contain the marker text
+_EXTRACT_SCRIPT = """
+const [selector, marker] = arguments;
+if (marker && !document.body.textContent.includes(marker)) return null;
+return Array.from(document.querySelectorAll(selector), (element) => element.outerHTML).join("");
+"""
 
-class SchulmanagerOnlineScraperAuthError(Exception):
-    """Exception to indicate an authentication error."""
+
+class _SessionExpiredError(SchulmanagerOnlineScraperError):
+    """The browser session was rejected and a page redirected to the login form."""
 
 
 class SchulmanagerOnlineScraper:
     """Web scraper for Schulmanager Online."""
 
-    def __init__(self, username: str, password: str) -> None:
+    def __init__(
+        self,
+        username: str,
+        password: str,
+        browser_pool: Optional[SchulmanagerOnlineBrowserPool] = None,
+        chromedriver_path: Optional[str] = None,
+        session_store: Optional[SchulmanagerOnlineSessionStore] = None,
+    ) -> None:
         """Initialize the scraper."""
         self._username = username
         self._password = password
-        self._driver = None
-
-    async def _init_driver(self) -> webdriver.Chrome:
-        """Initialize the Chrome WebDriver."""
-        chrome_options = Options()
-        chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--window-size=1920,1080")
-        
-        # Run ChromeDriverManager().install() in a thread to avoid blocking the event loop
-        import concurrent.futures
-        loop = asyncio.get_event_loop()
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            driver_path = await loop.run_in_executor(executor, ChromeDriverManager().install)
-        
-        service = Service(driver_path)
-        driver = webdriver.Chrome(service=service, options=chrome_options)
-        return driver
-
-    async def _login(self, driver: webdriver.Chrome) -> bool:
-        """Login to Schulmanager Online."""
+        self._session_store = session_store
+        # Whether this scraper's browser context is assumed to be logged in; a page
+        # redirecting to the login form proves otherwise
+        self._logged_in = False
+        self._readiness = PageReadiness()
+        # Wall time, browser CPU time and peak browser memory of the last scrape per step
+        self.metrics: Dict[str, Dict[str, float]] = {}
+        self.breaker = CircuitBreaker("Schulmanager Online scraper")
+        self._lock = asyncio.Lock()
+        self._pool = browser_pool or SchulmanagerOnlineBrowserPool()
+        self._pool.register(self, chromedriver_path)
+
+    @property
+    def stagger_delay(self) -> float:
+        """Return how long to defer the first scrape, so config entries start one after another."""
+        return self._pool.stagger_delay(self)
+
+    async def async_close(self) -> None:
+        """Release this scraper's browser context, and the browser if nobody else uses it."""
+        await self._pool.async_release(self)
+
+    async def _run(self, func: Callable[..., _T], *args: Any) -> _T:
+        """Run a blocking scraping step without blocking the event loop."""
+        return await self._pool.driver_manager.async_run(func, *args)
+
+    def _login(self, driver: webdriver.Chrome) -> bool:
+        """Login to Schulmanager Online.
+
+        Only a rejected login raises an auth error. A site that does not load
+        raises a scraper error, so it is retried and counted by the breaker.
+        """
         _LOGGER.debug("Attempting to log in to Schulmanager Online.")
         try:
             driver.get(LOGIN_URL)
             _LOGGER.debug(f"Navigated to {LOGIN_URL}")
             
-            # Wait for login form
-            wait = WebDriverWait(driver, 20) # Increased timeout
-            
-            # Check if already logged in
-            try:
-                wait.until(EC.presence_of_element_located((By.ID, "accountDropdown")))
+            # Wait for the login form, or the account menu if the browser is still logged in
+            if not self._readiness.wait(driver, "login", f"{_ACCOUNT_MENU}, {_LOGIN_FORM}"):
+                raise SchulmanagerOnlineScraperError("Login page did not load")
+            if driver.find_elements(By.CSS_SELECTOR, _ACCOUNT_MENU):
                 _LOGGER.info("Already logged in.")
                 return True
-            except:
-                _LOGGER.debug("Not already logged in, proceeding with login.")
-                pass
             
             # Find and fill login form
-            username_field = wait.until(
-                EC.presence_of_element_located((By.ID, "emailOrUsername"))
-            )
+            username_field = driver.find_element(By.CSS_SELECTOR, _LOGIN_FORM)
             password_field = driver.find_element(By.ID, "password")
             login_button = driver.find_element(By.XPATH, "//button[contains(text(), 'Einloggen')]") # More robust button finding
             
@@ -88,292 +107,261 @@ class SchulmanagerOnlineScraper:
             _LOGGER.debug("Entered credentials and clicked login button.")
             
             # Wait for successful login or error message
-            try:
-                wait.until(EC.presence_of_element_located((By.ID, "accountDropdown")))
+            ready = self._readiness.wait(
+                driver, "login_submit", f"{_ACCOUNT_MENU}, {_LOGIN_ERROR}"
+            )
+            if driver.find_elements(By.CSS_SELECTOR, _ACCOUNT_MENU):
                 _LOGGER.info("Login successful.")
                 return True
-            except Exception as e:
-                _LOGGER.debug(f"Login failed to find accountDropdown: {e}")
-                # Check for invalid credentials message
-                try:
-                    error_message = driver.find_element(By.CLASS_NAME, "alert-danger").text
-                    _LOGGER.error(f"Login failed with error message: {error_message}")
-                    raise SchulmanagerOnlineScraperAuthError(f"Login failed: {error_message}")
-                except:
-                    _LOGGER.error("Login failed: No specific error message found on page.")
-                    raise SchulmanagerOnlineScraperAuthError("Login failed: Unknown reason, possibly invalid credentials or page change.")
             
+            # Check for invalid credentials message
+            errors = driver.find_elements(By.CSS_SELECTOR, _LOGIN_ERROR)
+            if errors:
+                error_message = errors[0].text
+                _LOGGER.error(f"Login failed with error message: {error_message}")
+                raise SchulmanagerOnlineScraperAuthError(f"Login failed: {error_message}")
+            if not ready:
+                raise SchulmanagerOnlineScraperError("Login did not complete")
+            if driver.find_elements(By.CSS_SELECTOR, _LOGIN_FORM):
+                _LOGGER.error("Login failed: No specific error message found on page.")
+                raise SchulmanagerOnlineScraperAuthError("Login failed: Unknown reason, possibly invalid credentials or page change.")
+            raise SchulmanagerOnlineScraperError("Login led to an unexpected page")
+            
+        except (SchulmanagerOnlineScraperAuthError, SchulmanagerOnlineScraperError):
+            raise
         except Exception as err:
-            _LOGGER.error("Login process encountered an unexpected error: %s", err)
-            raise SchulmanagerOnlineScraperAuthError(f"Login process failed: {err}") from err
+            _LOGGER.debug("Login process encountered an unexpected error: %s", err)
+            raise SchulmanagerOnlineScraperError(f"Login process failed: {err}") from err
+
+    def _capture_session(self, driver: webdriver.Chrome) -> Dict[str, Any]:
+        """Return the cookies and JWT of the logged in browser."""
+        return {
+            "cookies": driver.get_cookies(),
+            "jwt": driver.execute_script("return window.localStorage.getItem('jwt');"),
+        }
+
+    def _restore_session(self, driver: webdriver.Chrome, session: Dict[str, Any]) -> None:
+        """Inject a previously captured session into the browser."""
+        # Cookies and localStorage can only be set for the page's own origin
+        driver.get(BASE_URL)
+        for cookie in session.get("cookies", []):
+            try:
+                driver.add_cookie(cookie)
+            except Exception as err:  # pylint: disable=broad-except
+                _LOGGER.debug("Could not restore cookie %s: %s", cookie.get("name"), err)
+        if session.get("jwt"):
+            driver.execute_script(
+                "window.localStorage.setItem('jwt', arguments[0]);", session["jwt"]
+            )
+        # The app already started without a session, and the steps only change the
+        # #/ fragment, which does not reload it. Restart it so it reads the session.
+        driver.refresh()
+
+    async def _async_ensure_logged_in(self, driver: webdriver.Chrome, new_context: bool) -> None:
+        """Reuse the browser's or the stored session, logging in only without one.
+
+        Whether a session is still accepted is not checked up front, that
+        would cost a page load per step; the steps detect the login form instead.
+        """
+        if new_context:
+            # A new browser context: try the session stored by a previous one
+            self._logged_in = False
+            await self._run(install_request_tracker, driver)
+            if self._session_store is not None:
+                if session := await self._session_store.async_load():
+                    await self._run(self._restore_session, driver, session)
+                    self._logged_in = True
+
+        if self._logged_in:
+            return
 
-    async def _scrape_homework(self, driver: webdriver.Chrome) -> List[Dict[str, Any]]:
+        if not await self._run(self._login, driver):
+            raise SchulmanagerOnlineScraperAuthError("Login failed")
+        self._logged_in = True
+
+        if self._session_store is not None:
+            session = await self._run(self._capture_session, driver)
+            await self._session_store.async_save(session)
+
+    def _wait_for_page(self, driver: webdriver.Chrome, step: str, selector: str) -> bool:
+        """Wait for a page of the logged in area, like PageReadiness.wait.
+
+        Raises _SessionExpiredError if the page redirected to the login form.
+        """
+        ready = self._readiness.wait(driver, step, f"{selector}, {_LOGIN_FORM}")
+        if driver.find_elements(By.CSS_SELECTOR, _LOGIN_FORM):
+            raise _SessionExpiredError("Redirected to the login form")
+        return ready
+
+    def _extract(
+        self, driver: webdriver.Chrome, selector: str, marker: Optional[str] = None
+    ) -> Optional[str]:
+        """Return the HTML of the containers matching selector in one script call.
+
+        The selector must not match elements nested in each other, or their
+        HTML would be returned twice.
+        """
+        html = driver.execute_script(_EXTRACT_SCRIPT, selector, marker)
+        if html is not None:
+            _LOGGER.debug("Extracted %d characters of %s", len(html), selector)
+        return html
+
+    def _scrape_homework(self, driver: webdriver.Chrome) -> List[Dict[str, Any]]:
         """Scrape homework data."""
         _LOGGER.debug("Attempting to scrape homework.")
         try:
             driver.get(HOMEWORK_URL)
             
-            # Wait for homework page to load
-            wait = WebDriverWait(driver, 15)
-            wait.until(EC.visibility_of_element_located((By.CSS_SELECTOR, ".tile")))
-            
-            if "Hausaufgaben" not in driver.page_source:
-                _LOGGER.debug("Hausaufgaben not found on first attempt, waiting 7 seconds.")
-                await asyncio.sleep(7)
-                if "Hausaufgaben" not in driver.page_source:
-                    _LOGGER.warning("Hausaufgaben still not found after retry. Returning empty list.")
-                    return []
+            # Wait until the tiles rendered and their requests finished
+            if not self._wait_for_page(driver, "homework", ".tile"):
+                raise SchulmanagerOnlineScraperError("Homework page did not finish loading")
             
-            html = driver.page_source
-            blocks = html.split("tile\">")
-            blocks.pop(0)
+            html = self._extract(driver, ".tile:not(.tile .tile)", "Hausaufgaben")
+            if html is None:
+                raise SchulmanagerOnlineScraperError("Hausaufgaben not found on the loaded page")
             
-            if not blocks:
+            homework_list = [record.as_dict() for record in parse_homework(html)]
+            if not homework_list:
                 _LOGGER.info("No homework blocks found.")
                 return []
             
-            homework_list = []
-            for block in blocks:
-                homework_item = self._parse_homework_block(block)
-                if homework_item:
-                    homework_list.extend(homework_item)
-            
             _LOGGER.debug(f"Scraped {len(homework_list)} homework items.")
             return homework_list
             
+        except SchulmanagerOnlineScraperError:
+            raise
         except Exception as err:
-            _LOGGER.error("Failed to scrape homework: %s", err)
-            return []
-
-    def _parse_homework_block(self, block: str) -> Optional[List[Dict[str, Any]]]:
-        """Parse a homework block."""
-        try:
-            # Extract date
-            date_str = block.split(", ", 1)[1].split("\n")[0]
-            
-            # Extract subjects
-            lessons = block.split("<h4 ")
-            lessons.pop(0)
-            subjects = []
-            for lesson in lessons:
-                subject = lesson.split(">")[1].split("<")[0]
-                subjects.append(subject)
-            
-            # Extract tasks
-            tasks = block.split("<span ")
-            tasks.pop(0)
-            task_list = []
-            for task in tasks:
-                task_text = task.split(">")[1].split("<")[0]
-                task_list.append(task_text)
-            
-            # Format date
-            day, month, year = date_str.split(".")
-            formatted_date = f"{year}-{month.zfill(2)}-{day.zfill(2)}"
-            
-            # Create homework items
-            homework_items = []
-            for i, subject in enumerate(subjects):
-                if i < len(task_list):
-                    homework_items.append({
-                        "date": formatted_date,
-                        "subject": subject,
-                        "task": task_list[i],
-                        "description": f"{subject}: {task_list[i]}"
-                    })
-            
-            return homework_items
-            
-        except Exception as err:
-            _LOGGER.error("Failed to parse homework block: %s", err)
-            return None
+            raise SchulmanagerOnlineScraperError(f"Failed to scrape homework: {err}") from err
 
-    async def _scrape_exams(self, driver: webdriver.Chrome) -> List[Dict[str, Any]]:
+    def _scrape_exams(self, driver: webdriver.Chrome) -> List[Dict[str, Any]]:
         """Scrape exam data."""
         _LOGGER.debug("Attempting to scrape exams.")
         try:
             # Navigate to dashboard where exams are displayed
-            driver.get("https://login.schulmanager-online.de/#/")
+            driver.get(DASHBOARD_URL)
+            
+            # The exam table is loaded after the dashboard tiles, so wait for its requests too
+            if not self._wait_for_page(driver, "exams", ".tile"):
+                raise SchulmanagerOnlineScraperError("Dashboard did not finish loading")
             
-            html = driver.page_source
+            html = self._extract(driver, "table:not(table table)")
             
-            if "<table " not in html:
+            if not html:
                 _LOGGER.info("No exam table found on dashboard. Returning empty list.")
                 return []
             
-            table_content = html.split("<table ")[1].split("</table>")[0]
-            rows = table_content.split("<tr ")
-            rows.pop(0)
-            
-            exams = []
-            for row in rows:
-                exam = self._parse_exam_row(row)
-                if exam:
-                    exams.append(exam)
+            exams = [record.as_dict() for record in parse_exams(html)]
             
             _LOGGER.debug(f"Scraped {len(exams)} exam items.")
             return exams
             
+        except SchulmanagerOnlineScraperError:
+            raise
         except Exception as err:
-            _LOGGER.error("Failed to scrape exams: %s", err)
-            return []
-
-    def _parse_exam_row(self, row: str) -> Optional[Dict[str, Any]]:
-        """Parse an exam row."""
-        try:
-            # Extract subject
-            subject = row.split("<strong ")[1].split(">")[1].split("<")[0]
-            
-            # Extract date
-            row_after_subject = row.split(subject)[1]
-            date_str = row_after_subject.split("<td ")[1].split(">")[1].split("\n")[1].split("\n")[0].split(", ")[1].split(",")[0]
-            
-            # Add current year if not present
-            current_year = datetime.now().year
-            if str(current_year) not in date_str:
-                date_str = f"{date_str}{current_year}"
-            
-            # Extract time
-            time_section = row_after_subject.split(date_str)[1]
-            begin_time = time_section.split("<br")[1].split(">")[1].split("<")[0].replace(" ", "").replace("\n", "")
-            end_time = " - " + time_section.split("- ")[1].split("\n")[0]
-            full_time = begin_time + end_time
-            
-            # Format date
-            day, month, year = date_str.split(".")
-            formatted_date = f"{year}-{month.zfill(2)}-{day.zfill(2)}"
-            
-            return {
-                "date": formatted_date,
-                "subject": subject,
-                "time": full_time,
-                "description": f"{full_time} {subject}"
-            }
-            
-        except Exception as err:
-            _LOGGER.error("Failed to parse exam row: %s", err)
-            return None
+            raise SchulmanagerOnlineScraperError(f"Failed to scrape exams: {err}") from err
 
-    async def _scrape_timetable(self, driver: webdriver.Chrome, start_date: str = "") -> List[List[str]]:
+    def _scrape_timetable(self, driver: webdriver.Chrome, start_date: str = "") -> TimetableWeek:
         """Scrape timetable data."""
         _LOGGER.debug("Attempting to scrape timetable.")
         try:
             url = f"{SCHEDULES_URL}/{start_date}"
             driver.get(url)
             
-            # Wait for timetable to load
-            wait = WebDriverWait(driver, 15)
-            wait.until(EC.presence_of_element_located((By.TAG_NAME, "class-hour-calendar")))
-            
-            html = driver.page_source
-            table_content = html.split("<table", 1)[1].split("</table>", 1)[0]
-            
-            rows = table_content.split("<tr>")
-            del rows[0]  # Remove header
-            del rows[0]  # Remove time row
+            # Wait for the calendar component and its lessons to load
+            if not self._wait_for_page(driver, "timetable", "class-hour-calendar"):
+                raise SchulmanagerOnlineScraperError("Timetable did not finish loading")
             
-            # Initialize days
-            week_schedule = [[] for _ in range(7)]  # Mon-Sun
+            week_schedule = parse_timetable(self._extract(driver, "class-hour-calendar") or "")
             
-            for row in rows:
-                columns = row.split("<td>")
-                for i, column in enumerate(columns[1:8]):  # Skip first column (time)
-                    lesson_info = self._parse_lesson_cell(column)
-                    week_schedule[i].append(lesson_info)
-            
-            _LOGGER.debug(f"Scraped timetable for {len(week_schedule)} days.")
+            _LOGGER.debug(f"Scraped timetable with {week_schedule.periods} periods.")
             return week_schedule
             
+        except SchulmanagerOnlineScraperError:
+            raise
         except Exception as err:
-            _LOGGER.error("Failed to scrape timetable: %s", err)
-            return []
+            raise SchulmanagerOnlineScraperError(f"Failed to scrape timetable: {err}") from err
 
-    def _parse_lesson_cell(self, cell: str) -> str:
-        """Parse a lesson cell from the timetable."""
-        try:
-            cell_content = cell.split("</td>", 1)[0]
-            
-            if "span" not in cell_content:
-                return ""
-            
-            if "lesson-cell cancelled" in cell_content:
-                # Cancelled lesson
-                lesson = cell_content.split("lesson-cell cancelled\">", 1)[1]
-                lesson = lesson.split("timetable-left\">", 1)[1].split("timetable-right", 1)[0]
-                lesson = lesson.split("</")[0]
-                return f"<del>{lesson}</del>"
-            
-            elif "<span style=\"color" in cell_content and "Inter" not in cell_content:
-                # Changed lesson
-                if "red;\">" in cell_content and "green;\">" in cell_content:
-                    old = cell_content.split("red;\">")[1].split("<", 1)[0].strip()
-                    new = cell_content.split("green;\">")[1].split("<", 1)[0].strip()
-                    return f"{old} → {new}"
-            
-            else:
-                # Regular lesson
-                try:
-                    lesson = cell_content.split("timetable-left\">", 1)[1].split("timetable-right", 1)[0]
-                    lesson = lesson.split(">")[2].split("<", 1)[0].replace(" ", "").replace("\n", "")
-                    
-                    teacher = cell_content.split("timetable-right\">", 1)[1].split("timetable-bottom", 1)[0]
-                    teacher = teacher.split(">")[5].split("<")[0].replace(" ", "").replace("\n", "")
-                    
-                    room = cell_content.split("timetable-bottom\">", 1)[1]
-                    room = room.split(">")[3].split("<")[0].replace(" ", "").replace("\n", "")
-                    
-                    return f"{lesson} {teacher} {room}".strip()
-                except:
-                    _LOGGER.debug("Could not parse regular lesson details.")
-                    return ""
-            
-        except Exception as err:
-            _LOGGER.debug("Failed to parse lesson cell: %s", err)
-            return ""
+    async def _async_scrape(self, step: Callable[..., _T], *args: Any) -> _T:
+        """Run a scraping step, retrying page errors with backoff.
+
+        After repeated failures the circuit breaker skips scraping for a
+        while, instead of paying for a browser start and its timeouts.
+        """
+        if not self.breaker.allow_request():
+            raise SchulmanagerOnlineScraperError("Scraping paused after repeated failures")
 
-    async def scrape_all_data(self) -> Dict[str, Any]:
-        """Scrape all available data."""
-        driver = None
-        try:
-            driver = await self._init_driver()
-            
-            # Login
-            login_success = await self._login(driver)
-            if not login_success:
-                raise SchulmanagerOnlineScraperAuthError("Login failed")
-            
-            # Scrape data
-            homework = await self._scrape_homework(driver)
-            exams = await self._scrape_exams(driver)
-            timetable = await self._scrape_timetable(driver)
-            
-            return {
-                "homework": homework,
-                "exams": exams,
-                "timetable": timetable,
-                "appointments": [],  # Placeholder for future implementation
-            }
-            
-        except Exception as err:
-            _LOGGER.error("Scraping failed: %s", err)
-            raise SchulmanagerOnlineScraperError(f"Scraping failed: {err}") from err
-        
-        finally:
-            if driver:
-                driver.quit()
-
-    async def test_connection(self) -> bool:
-        """Test the connection and authentication."""
-        driver = None
         try:
-            driver = await self._init_driver()
-            return await self._login(driver)
-        except Exception as e:
-            _LOGGER.error(f"Test connection failed: {e}")
-            return False
-        finally:
-            if driver:
-                driver.quit()
+            result = await async_retry(
+                lambda: self._async_scrape_once(step, *args), (SchulmanagerOnlineScraperError,)
+            )
+        except SchulmanagerOnlineScraperError as err:
+            self.breaker.record_failure(err)
+            raise
+        self.breaker.record_success()
+        return result
+
+    async def _async_scrape_once(self, step: Callable[..., _T], *args: Any) -> _T:
+        """Run a scraping step in a logged in browser.
+
+        Steps of all data sources and config entries share one browser, so they
+        run one at a time.
+        """
+        async with self._lock:
+            try:
+                # The browser is kept alive between polls, so this is usually a warm session
+                async with self._pool.async_session(self) as (driver, new_context):
+                    driver_manager = self._pool.driver_manager
+                    started = time.monotonic()
+                    before = await self._run(driver_manager.get_usage, True)
+
+                    # Reuse the existing session where possible, log in only if it was rejected
+                    await self._async_ensure_logged_in(driver, new_context)
+                    try:
+                        result = await self._run(step, driver, *args)
+                    except _SessionExpiredError:
+                        _LOGGER.debug("Session expired, logging in again")
+                        self._logged_in = False
+                        await self._async_ensure_logged_in(driver, False)
+                        result = await self._run(step, driver, *args)
+                    after = await self._run(driver_manager.get_usage)
+                    self._record_metrics(step, time.monotonic() - started, before, after)
+                    return result
+
+            except SchulmanagerOnlineScraperAuthError:
+                # Retrying a rejected login would only risk locking the account
+                raise
+            except Exception as err:
+                _LOGGER.debug("Scraping failed: %s", err)
+                raise SchulmanagerOnlineScraperError(f"Scraping failed: {err}") from err
+
+    def _record_metrics(
+        self,
+        step: Callable[..., Any],
+        wall_time: float,
+        before: Optional[ProcessTreeUsage],
+        after: Optional[ProcessTreeUsage],
+    ) -> None:
+        """Remember the wall time, browser CPU time and peak memory of a scrape."""
+        metrics: Dict[str, float] = {"wall_time": round(wall_time, 3)}
+        if before is not None and after is not None:
+            metrics["cpu_time"] = round(after.cpu_time - before.cpu_time, 3)
+            metrics["peak_rss"] = after.peak_rss
+        name = step.__name__.removeprefix("_scrape_")
+        self.metrics[name] = metrics
+        _LOGGER.debug("Scraped %s: %s", name, metrics)
+
+    async def scrape_homework(self) -> List[Dict[str, Any]]:
+        """Scrape the homework page."""
+        return await self._async_scrape(self._scrape_homework)
 
+    async def scrape_exams(self) -> List[Dict[str, Any]]:
+        """Scrape the exams shown on the dashboard."""
+        return await self._async_scrape(self._scrape_exams)
 
+    async def scrape_timetable(self, start_date: str = "") -> TimetableWeek:
+        """Scrape the timetable of the week containing start_date."""
+        return await self._async_scrape(self._scrape_timetable, start_date)
 
+    async def scrape_appointments(self) -> List[Dict[str, Any]]:
+        """Scrape appointments."""
+        return []  # Placeholder for future implementation
@@ -1,28 +1,43 @@
 """Sensor platform for Schulmanager Online."""
 from __future__ import annotations
 
+from datetime import datetime
 import logging
 from typing import Any, Dict, Optional
 
 from homeassistant.components.sensor import SensorEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+import voluptuous as vol
+from homeassistant.core import HomeAssistant, ServiceResponse, SupportsResponse, callback
+from homeassistant.helpers import config_validation as cv, entity_platform
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_track_time_change
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
 
-from . import SchulmanagerOnlineDataUpdateCoordinator
+from .coordinator import SchulmanagerOnlineData, SchulmanagerOnlineSourceCoordinator
 from .const import (
     ATTR_APPOINTMENTS,
+    ATTR_DATA_AGE,
     ATTR_EXAMS,
     ATTR_HOMEWORK,
     ATTR_LAST_UPDATE,
     ATTR_LETTERS,
-    ATTR_TIMETABLE,
+    ATTR_LIMIT,
+    ATTR_OFFSET,
+    ATTR_STALE,
     ATTR_TOTAL_COUNT,
     ATTR_UNREAD_COUNT,
+    ATTR_UPCOMING_EXAMS,
+    ATTR_UPCOMING_HOMEWORK,
+    ATTR_WEEKS,
     CONF_ENABLE_SCRAPING,
+    CONF_MAX_ATTRIBUTE_ITEMS,
+    DEFAULT_MAX_ATTRIBUTE_ITEMS,
     DOMAIN,
     SENSOR_TYPES,
+    SERVICE_GET_ITEMS,
+    WEEKDAYS,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -34,45 +49,112 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up the sensor platform."""
-    coordinator = hass.data[DOMAIN][config_entry.entry_id]
+    data: SchulmanagerOnlineData = hass.data[DOMAIN][config_entry.entry_id]
     scraping_enabled = config_entry.data.get(CONF_ENABLE_SCRAPING, False)
 
-    entities = []
-    
-    # Always add basic sensors
-    entities.extend([
-        SchulmanagerOnlineSensor(coordinator, "letters"),
-        SchulmanagerOnlineSensor(coordinator, "unread_letters"),
-    ])
-    
-    # Add scraping sensors if enabled
+    # Homework, exams and the timetable come from the API, appointments only from scraping
+    sensor_types = ["letters", "unread_letters", "homework", "exams", "timetable"]
     if scraping_enabled:
-        entities.extend([
-            SchulmanagerOnlineSensor(coordinator, "homework"),
-            SchulmanagerOnlineSensor(coordinator, "exams"),
-            SchulmanagerOnlineSensor(coordinator, "appointments"),
-            SchulmanagerOnlineSensor(coordinator, "timetable"),
-        ])
+        sensor_types.append("appointments")
+
+    max_items = config_entry.options.get(CONF_MAX_ATTRIBUTE_ITEMS, DEFAULT_MAX_ATTRIBUTE_ITEMS)
+
+    # Each sensor only listens to the coordinator of its own data source
+    entities = [
+        SchulmanagerOnlineSensor(
+            data.coordinators[SENSOR_TYPES[sensor_type]["source"]],
+            config_entry.entry_id,
+            sensor_type,
+            max_items,
+        )
+        for sensor_type in sensor_types
+    ]
 
     async_add_entities(entities)
 
+    # The state only carries the first items of each list, the service returns all of them
+    platform = entity_platform.async_get_current_platform()
+    platform.async_register_entity_service(
+        SERVICE_GET_ITEMS,
+        {
+            vol.Optional(ATTR_OFFSET, default=0): cv.positive_int,
+            vol.Optional(ATTR_LIMIT): vol.All(vol.Coerce(int), vol.Range(min=1)),
+        },
+        "async_get_items",
+        supports_response=SupportsResponse.ONLY,
+    )
+
 
 class SchulmanagerOnlineSensor(CoordinatorEntity, SensorEntity):
     """Representation of a Schulmanager Online sensor."""
 
+    # Large lists stay out of the recorder, they are available through the get_items service
+    _unrecorded_attributes = frozenset(
+        {
+            ATTR_LETTERS,
+            ATTR_HOMEWORK,
+            ATTR_UPCOMING_HOMEWORK,
+            ATTR_EXAMS,
+            ATTR_UPCOMING_EXAMS,
+            ATTR_APPOINTMENTS,
+            ATTR_DATA_AGE,
+            *WEEKDAYS,
+        }
+    )
+
     def __init__(
         self,
-        coordinator: SchulmanagerOnlineDataUpdateCoordinator,
+        coordinator: SchulmanagerOnlineSourceCoordinator,
+        entry_id: str,
         sensor_type: str,
+        max_items: int = DEFAULT_MAX_ATTRIBUTE_ITEMS,
     ) -> None:
         """Initialize the sensor."""
         super().__init__(coordinator)
         self._sensor_type = sensor_type
+        self._max_items = max_items
         self._attr_name = f"Schulmanager Online {SENSOR_TYPES[sensor_type]['name']}"
-        self._attr_unique_id = f"{DOMAIN}_{sensor_type}"
+        self._attr_unique_id = f"{entry_id}_{sensor_type}"
         self._attr_icon = SENSOR_TYPES[sensor_type]["icon"]
         self._attr_unit_of_measurement = SENSOR_TYPES[sensor_type]["unit"]
         self._attr_device_class = SENSOR_TYPES[sensor_type]["device_class"]
+        self._data_keys = SENSOR_TYPES[sensor_type]["data_keys"]
+        self._last_fingerprint: Optional[tuple] = None
+
+    def _get_fingerprint(self) -> tuple:
+        """Return what the written state of this sensor depends on."""
+        return (
+            self.coordinator.last_update_success,
+            self.coordinator.stale,
+            *(self.coordinator.fingerprints.get(key) for key in self._data_keys),
+        )
+
+    async def async_added_to_hass(self) -> None:
+        """Remember the fingerprint of the state written when the entity is added."""
+        await super().async_added_to_hass()
+        self._last_fingerprint = self._get_fingerprint()
+
+        # The upcoming items change at midnight even if the data does not
+        if self._sensor_type in ("homework", "exams"):
+            self.async_on_remove(
+                async_track_time_change(
+                    self.hass, self._async_midnight, hour=0, minute=0, second=0
+                )
+            )
+
+    @callback
+    def _async_midnight(self, now: datetime) -> None:
+        """Write the state with the upcoming items of the new day."""
+        self.async_write_ha_state()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state only if the data slice of this sensor changed."""
+        fingerprint = self._get_fingerprint()
+        if fingerprint == self._last_fingerprint:
+            return
+        self._last_fingerprint = fingerprint
+        super()._handle_coordinator_update()
 
     @property
     def native_value(self) -> Optional[int]:
@@ -94,9 +176,9 @@ class SchulmanagerOnlineSensor(CoordinatorEntity, SensorEntity):
             appointments_list = self.coordinator.data.get("appointments", [])
             return len(appointments_list)
         elif self._sensor_type == "timetable":
-            timetable_data = self.coordinator.data.get("timetable", [])
+            timetable = self.coordinator.data.get("timetable")
             # Return number of days with lessons
-            return len([day for day in timetable_data if day])
+            return timetable.days_with_lessons() if timetable else 0
 
         return None
 
@@ -107,44 +189,75 @@ class SchulmanagerOnlineSensor(CoordinatorEntity, SensorEntity):
             return {}
 
         attributes = {
-            ATTR_LAST_UPDATE: self.coordinator.last_update_success_time,
+            ATTR_LAST_UPDATE: self.coordinator.fetched_at,
+            # Restored data is shown until the first live refresh, with its age in seconds
+            ATTR_STALE: self.coordinator.stale,
         }
+        if self.coordinator.stale and self.coordinator.fetched_at:
+            attributes[ATTR_DATA_AGE] = int(
+                (dt_util.utcnow() - self.coordinator.fetched_at).total_seconds()
+            )
 
         if self._sensor_type == "letters":
-            attributes[ATTR_LETTERS] = self.coordinator.data.get("letters", [])
+            attributes[ATTR_LETTERS] = self._cap(self.coordinator.data.get("letters", []))
             attributes[ATTR_TOTAL_COUNT] = self.coordinator.data.get(ATTR_TOTAL_COUNT, 0)
             attributes[ATTR_UNREAD_COUNT] = self.coordinator.data.get(ATTR_UNREAD_COUNT, 0)
         elif self._sensor_type == "homework":
             homework_list = self.coordinator.data.get("homework", [])
-            attributes[ATTR_HOMEWORK] = homework_list
-            attributes["upcoming_homework"] = [
-                hw for hw in homework_list 
-                if hw.get("date", "") >= self._get_today_string()
-            ]
+            attributes[ATTR_HOMEWORK] = self._cap(homework_list)
+            attributes[ATTR_UPCOMING_HOMEWORK] = self._cap(
+                self.coordinator.date_index.upcoming(dt_util.now().date())
+            )
         elif self._sensor_type == "exams":
             exams_list = self.coordinator.data.get("exams", [])
-            attributes[ATTR_EXAMS] = exams_list
-            attributes["upcoming_exams"] = [
-                exam for exam in exams_list 
-                if exam.get("date", "") >= self._get_today_string()
-            ]
+            attributes[ATTR_EXAMS] = self._cap(exams_list)
+            attributes[ATTR_UPCOMING_EXAMS] = self._cap(
+                self.coordinator.date_index.upcoming(dt_util.now().date())
+            )
         elif self._sensor_type == "appointments":
-            attributes[ATTR_APPOINTMENTS] = self.coordinator.data.get("appointments", [])
+            attributes[ATTR_APPOINTMENTS] = self._cap(
+                self.coordinator.data.get("appointments", [])
+            )
         elif self._sensor_type == "timetable":
-            timetable_data = self.coordinator.data.get("timetable", [])
-            attributes[ATTR_TIMETABLE] = timetable_data
-            if timetable_data:
-                day_names = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
-                for i, day_schedule in enumerate(timetable_data):
-                    if i < len(day_names):
-                        attributes[day_names[i]] = day_schedule
+            # The week is stored once, rendered to strings per weekday only here
+            timetable = self.coordinator.data.get("timetable")
+            if timetable:
+                for i, day_name in enumerate(WEEKDAYS):
+                    attributes[day_name] = self._cap(timetable.render_day(i))
+            # Further weeks are only listed, their lessons are paged via get_items
+            attributes[ATTR_WEEKS] = list(self.coordinator.data.get("timetable_weeks", {}))
 
         return attributes
 
-    def _get_today_string(self) -> str:
-        """Get today's date as YYYY-MM-DD string."""
-        from datetime import datetime
-        return datetime.now().strftime("%Y-%m-%d")
+    def _cap(self, items: list) -> list:
+        """Limit a list attribute to the configured number of items."""
+        return items[: self._max_items]
+
+    def _get_items(self) -> list:
+        """Return the full list behind this sensor."""
+        if not self.coordinator.data:
+            return []
+        if self._sensor_type == "unread_letters":
+            return [
+                letter for letter in self.coordinator.data.get("letters", [])
+                if not letter["read"]
+            ]
+        if self._sensor_type == "timetable":
+            return [
+                {"week": key, **week.as_dict()}
+                for key, week in self.coordinator.data.get("timetable_weeks", {}).items()
+            ]
+        return self.coordinator.data.get(self._data_keys[0], [])
+
+    async def async_get_items(self, offset: int = 0, limit: Optional[int] = None) -> ServiceResponse:
+        """Return a page of the full list behind this sensor."""
+        items = self._get_items()
+        end = None if limit is None else offset + limit
+        return {
+            "items": items[offset:end],
+            "offset": offset,
+            "total": len(items),
+        }
 
     @property
     def available(self) -> bool:
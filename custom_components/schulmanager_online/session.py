@@ -0,0 +1,68 @@
+"""Encrypted persistence of the authenticated browser session."""
+import base64
+import hashlib
+import json
+import logging
+from typing import Any, Dict, Optional
+
+from cryptography.fernet import Fernet, InvalidToken
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, SESSION_KEY_ITERATIONS, SESSION_STORAGE_VERSION
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class SchulmanagerOnlineSessionStore:
+    """Store the cookies and JWT of a logged in browser, encrypted at rest.
+
+    The key is derived from the account password, so a session can only be
+    decrypted with the credentials that created it.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str, password: str) -> None:
+        """Initialize the session store."""
+        self._hass = hass
+        self._entry_id = entry_id
+        self._password = password
+        self._store: Store = Store(
+            hass, SESSION_STORAGE_VERSION, f"{DOMAIN}.{entry_id}.session"
+        )
+        self._fernet: Optional[Fernet] = None
+
+    async def _async_get_fernet(self) -> Fernet:
+        """Return the cipher, deriving the key on first use."""
+        if self._fernet is None:
+            key = await self._hass.async_add_executor_job(
+                hashlib.pbkdf2_hmac,
+                "sha256",
+                self._password.encode(),
+                f"{DOMAIN}:{self._entry_id}".encode(),
+                SESSION_KEY_ITERATIONS,
+            )
+            self._fernet = Fernet(base64.urlsafe_b64encode(key))
+        return self._fernet
+
+    async def async_load(self) -> Optional[Dict[str, Any]]:
+        """Return the stored session, or None if there is no usable one."""
+        stored = await self._store.async_load()
+        if not stored or "session" not in stored:
+            return None
+
+        fernet = await self._async_get_fernet()
+        try:
+            return json.loads(fernet.decrypt(stored["session"].encode()))
+        except (InvalidToken, ValueError):
+            _LOGGER.debug("Discarding stored session that could not be decrypted")
+            return None
+
+    async def async_save(self, session: Dict[str, Any]) -> None:
+        """Encrypt and store a session."""
+        fernet = await self._async_get_fernet()
+        token = fernet.encrypt(json.dumps(session).encode()).decode()
+        await self._store.async_save({"session": token})
+
+    async def async_remove(self) -> None:
+        """Remove the stored session."""
+        await self._store.async_remove()
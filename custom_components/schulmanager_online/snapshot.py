@@ -0,0 +1,56 @@
+"""Persisted snapshot of the last good data of a config entry."""
+from datetime import datetime
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, SNAPSHOT_SAVE_DELAY, SNAPSHOT_STORAGE_VERSION
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class SchulmanagerOnlineSnapshotStore:
+    """The last successfully fetched data of every source, with its time.
+
+    Setup restores the snapshot right away, so entities have a state
+    before the school's server or Chrome answered.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the snapshot store."""
+        self._store: Store = Store(
+            hass, SNAPSHOT_STORAGE_VERSION, f"{DOMAIN}.{entry_id}.snapshot"
+        )
+        self._sources: Dict[str, Dict[str, Any]] = {}
+
+    async def async_load(self) -> None:
+        """Load the snapshot from storage."""
+        stored = await self._store.async_load()
+        if stored:
+            self._sources = stored.get("sources", {})
+
+    @callback
+    def async_get(self, source: str) -> Optional[Tuple[Dict[str, Any], datetime]]:
+        """Return the data of a source and when it was fetched, if there is a snapshot."""
+        snapshot = self._sources.get(source)
+        if not snapshot or not (saved_at := dt_util.parse_datetime(snapshot["saved_at"])):
+            return None
+        return snapshot["data"], saved_at
+
+    @callback
+    def async_set(self, source: str, data: Dict[str, Any], fetched_at: datetime) -> None:
+        """Replace the data of a source, saved to storage after a delay."""
+        self._sources[source] = {"saved_at": fetched_at.isoformat(), "data": data}
+        self._store.async_delay_save(self._data_to_save, SNAPSHOT_SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> Dict[str, Any]:
+        """Return the data to store."""
+        return {"sources": self._sources}
+
+    async def async_remove(self) -> None:
+        """Remove the stored snapshot."""
+        await self._store.async_remove()
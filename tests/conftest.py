@@ -0,0 +1,24 @@
+"""Test configuration for the Schulmanager Online integration."""
+import importlib.util
+from pathlib import Path
+import sys
+
+COMPONENT_DIR = Path(__file__).parent.parent / "custom_components" / "schulmanager_online"
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+# The parsers and models are plain Python. The component is registered as the
+# package schulmanager_online without running its __init__, which sets up Home
+# Assistant, so they can be tested without it. Modules that need Home Assistant
+# or Selenium skip their tests when those are not installed.
+if "schulmanager_online" not in sys.modules:
+    _spec = importlib.util.spec_from_file_location(
+        "schulmanager_online",
+        COMPONENT_DIR / "__init__.py",
+        submodule_search_locations=[str(COMPONENT_DIR)],
+    )
+    sys.modules["schulmanager_online"] = importlib.util.module_from_spec(_spec)
+
+
+def load_fixture(name: str) -> str:
+    """Return the content of a recorded HTML fixture."""
+    return (FIXTURES_DIR / name).read_text(encoding="utf-8")
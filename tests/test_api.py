@@ -0,0 +1,198 @@
+"""Tests for the JSON API client against a local server replaying recorded responses."""
+import asyncio
+from datetime import date
+import json
+from typing import Any, Awaitable, Callable, Dict, List, TypeVar
+
+import pytest
+
+aiohttp = pytest.importorskip("aiohttp")
+pytest.importorskip("async_timeout")
+
+from aiohttp import web  # noqa: E402
+from aiohttp.test_utils import TestServer  # noqa: E402
+
+from conftest import load_fixture  # noqa: E402
+from schulmanager_online.api import (  # noqa: E402
+    SchulmanagerOnlineAPI,
+    SchulmanagerOnlineAuthError,
+)
+from schulmanager_online.models import Lesson, LessonStatus  # noqa: E402
+
+_T = TypeVar("_T")
+
+TOKEN = "recorded-token"
+
+# Recorded results of api/calls by "moduleName/endpointName", and of api/login-status
+CALLS: Dict[str, Any] = json.loads(load_fixture("api_calls.json"))
+LOGIN_STATUS: Dict[str, Any] = json.loads(load_fixture("api_login_status.json"))
+
+
+def _run_with_api(
+    test: Callable[[SchulmanagerOnlineAPI, List[Dict[str, Any]]], Awaitable[_T]],
+    token: str = TOKEN,
+) -> _T:
+    """Run a test coroutine with an API client pointed at the replaying server.
+
+    The test also gets the api/calls request bodies the server received.
+    """
+    received: List[Dict[str, Any]] = []
+
+    def _authorized(request: web.Request) -> bool:
+        return request.headers.get("Authorization") == f"Bearer {TOKEN}"
+
+    async def calls(request: web.Request) -> web.Response:
+        if not _authorized(request):
+            return web.Response(status=401)
+        body = await request.json()
+        received.append(body)
+        return web.json_response(
+            {
+                "results": [
+                    CALLS[f"{call['moduleName']}/{call['endpointName']}"]
+                    for call in body["requests"]
+                ]
+            }
+        )
+
+    async def login_status(request: web.Request) -> web.Response:
+        if not _authorized(request):
+            return web.Response(status=401)
+        return web.json_response(LOGIN_STATUS)
+
+    async def run() -> _T:
+        app = web.Application()
+        app.router.add_post("/api/calls", calls)
+        app.router.add_get("/api/login-status", login_status)
+        async with TestServer(app) as server, aiohttp.ClientSession() as session:
+            api = SchulmanagerOnlineAPI(token, session, api_root=str(server.make_url("/api")))
+            return await test(api, received)
+
+    return asyncio.run(run())
+
+
+def test_letters() -> None:
+    """Letters are parsed with their read status."""
+
+    async def test(api: SchulmanagerOnlineAPI, received: List[Dict[str, Any]]) -> None:
+        assert await api.get_letters() == [
+            {
+                "id": 101,
+                "title": "Einladung zum Elternabend",
+                "created_at": "2026-01-08T10:00:00.000Z",
+                "read": True,
+            },
+            {
+                "id": 102,
+                "title": "Wandertag der Klasse 7b",
+                "created_at": "2026-01-10T12:30:00.000Z",
+                "read": False,
+            },
+        ]
+        assert received[0]["requests"] == [
+            {"moduleName": "letters", "endpointName": "get-letters"}
+        ]
+
+    _run_with_api(test)
+
+
+def test_unchanged_response_is_reused() -> None:
+    """A byte-identical response hands out the previously parsed list."""
+
+    async def test(api: SchulmanagerOnlineAPI, received: List[Dict[str, Any]]) -> None:
+        first = await api.get_letters()
+        assert await api.get_letters() is first
+        assert len(received) == 2
+
+    _run_with_api(test)
+
+
+def test_homework_and_exams() -> None:
+    """Homework and exams of the student of a parent account are parsed."""
+
+    async def test(api: SchulmanagerOnlineAPI, received: List[Dict[str, Any]]) -> None:
+        homework = await api.get_homework()
+        exams = await api.get_exams()
+
+        assert homework == [
+            {
+                "date": "2026-01-12",
+                "subject": "Mathematik",
+                "task": "Buch S. 57, Nr. 3 a-c",
+                "description": "Mathematik: Buch S. 57, Nr. 3 a-c",
+            },
+            {
+                "date": "2026-01-12",
+                "subject": "Deutsch",
+                "task": 'Gedicht "Der Panther" lernen',
+                "description": 'Deutsch: Gedicht "Der Panther" lernen',
+            },
+        ]
+        assert exams == [
+            {
+                "date": "2026-01-20",
+                "subject": "Englisch",
+                "time": "08:00 - 09:30",
+                "description": "08:00 - 09:30 Englisch",
+            }
+        ]
+        # The student was resolved from the parent account and sent with the calls
+        student = LOGIN_STATUS["user"]["associatedParents"][0]["student"]
+        assert received[0]["requests"][0]["parameters"] == {"student": student}
+        assert received[1]["requests"][0]["parameters"]["student"] == student
+
+    _run_with_api(test)
+
+
+def test_timetable() -> None:
+    """The week grid starts at period 0 and has cancelled and substituted lessons."""
+
+    async def test(api: SchulmanagerOnlineAPI, received: List[Dict[str, Any]]) -> None:
+        week = await api.get_timetable(date(2026, 1, 14))
+
+        parameters = received[0]["requests"][0]["parameters"]
+        assert (parameters["start"], parameters["end"]) == ("2026-01-12", "2026-01-18")
+        assert (week.first_period, week.periods) == (0, 3)
+        assert week.day(0) == [
+            Lesson(0, "M", "MUE", "A101"),
+            Lesson(1, "D", "SCH", "B2", LessonStatus.CANCELLED),
+            None,
+        ]
+        assert week.day(1) == [
+            None,
+            None,
+            Lesson(2, "E", "KRA", "A1", LessonStatus.SUBSTITUTED, "E LEH A1"),
+        ]
+        assert week.days_with_lessons() == 2
+
+    _run_with_api(test)
+
+
+def test_batched_calls() -> None:
+    """Calls made in the same event loop iteration share one api/calls request."""
+
+    async def test(api: SchulmanagerOnlineAPI, received: List[Dict[str, Any]]) -> None:
+        await api.get_student()
+        weeks = await asyncio.gather(
+            api.get_timetable(date(2026, 1, 12)), api.get_timetable(date(2026, 1, 19))
+        )
+
+        assert len(received) == 1
+        assert [call["parameters"]["start"] for call in received[0]["requests"]] == [
+            "2026-01-12",
+            "2026-01-19",
+        ]
+        assert weeks[0] == weeks[1]
+
+    _run_with_api(test)
+
+
+def test_invalid_token() -> None:
+    """A rejected token raises the auth error."""
+
+    async def test(api: SchulmanagerOnlineAPI, received: List[Dict[str, Any]]) -> None:
+        with pytest.raises(SchulmanagerOnlineAuthError):
+            await api.get_letters()
+        assert not received
+
+    _run_with_api(test, token="expired-token")
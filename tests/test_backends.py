@@ -0,0 +1,43 @@
+"""Tests for the lazily imported scraping backend."""
+import subprocess
+import sys
+
+import pytest
+
+from conftest import COMPONENT_DIR
+
+pytest.importorskip("homeassistant")
+
+# The modules Home Assistant imports for a config entry without scraping
+_IMPORT_SCRIPT = """
+import sys
+import custom_components.schulmanager_online
+import custom_components.schulmanager_online.config_flow
+import custom_components.schulmanager_online.diagnostics
+import custom_components.schulmanager_online.sensor
+print(",".join(sorted({"selenium", "webdriver_manager"} & set(sys.modules))))
+"""
+
+
+def test_scraping_backend_not_imported() -> None:
+    """Importing the integration does not load Selenium or webdriver-manager."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _IMPORT_SCRIPT],
+        capture_output=True,
+        check=True,
+        cwd=COMPONENT_DIR.parent.parent,
+        text=True,
+    )
+
+    # -X importtime reports "self | cumulative | module" per import on stderr
+    cumulative = {
+        line.rsplit("|", 1)[1].strip(): int(line.split("|")[1])
+        for line in result.stderr.splitlines()
+        if line.startswith("import time:") and line.split("|")[1].strip().isdigit()
+    }
+    print(
+        f"\nImporting the integration took "
+        f"{cumulative.get('custom_components.schulmanager_online', 0) / 1000:.1f} ms"
+    )
+    assert result.stdout.strip() == ""
+    assert not any(module.startswith("selenium") for module in cumulative)
@@ -0,0 +1,67 @@
+"""Tests for the WebDriver worker thread."""
+import asyncio
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("homeassistant")
+pytest.importorskip("selenium")
+pytest.importorskip("webdriver_manager")
+
+from schulmanager_online.driver import SchulmanagerOnlineDriverManager  # noqa: E402
+
+# How long the simulated page blocks its thread, and the lag the loop may show meanwhile
+SLOW_PAGE = 1.0
+PROBE_INTERVAL = 0.01
+MAX_LOOP_LAG = 0.1
+
+
+def test_async_run_keeps_event_loop_responsive() -> None:
+    """A slow blocking WebDriver call does not stall the event loop."""
+
+    async def run() -> float:
+        manager = SchulmanagerOnlineDriverManager()
+        loop = asyncio.get_running_loop()
+        lags = []
+        done = False
+
+        async def probe() -> None:
+            while not done:
+                started = loop.time()
+                await asyncio.sleep(PROBE_INTERVAL)
+                lags.append(loop.time() - started - PROBE_INTERVAL)
+
+        probe_task = loop.create_task(probe())
+        try:
+            # Stands in for driver.get() of a page that takes a second to load
+            await manager.async_run(time.sleep, SLOW_PAGE)
+        finally:
+            done = True
+            await probe_task
+            await manager.async_close()
+
+        # The probe kept running the whole time
+        assert len(lags) > SLOW_PAGE / PROBE_INTERVAL / 2
+        return max(lags)
+
+    assert asyncio.run(run()) < MAX_LOOP_LAG
+
+
+def test_async_run_uses_one_thread() -> None:
+    """All calls run on the same worker thread, never on the event loop's."""
+
+    async def run() -> set:
+        manager = SchulmanagerOnlineDriverManager()
+        try:
+            return set(
+                await asyncio.gather(
+                    *(manager.async_run(threading.get_ident) for _ in range(5))
+                )
+            )
+        finally:
+            await manager.async_close()
+
+    threads = asyncio.run(run())
+    assert len(threads) == 1
+    assert threading.get_ident() not in threads
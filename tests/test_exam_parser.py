@@ -0,0 +1,117 @@
+"""Tests for the exam table parser of the dashboard."""
+from datetime import date
+import time
+
+import pytest
+
+from conftest import load_fixture
+from schulmanager_online.parsers import ExamRecord, infer_date, parse_exams
+
+
+def test_parse_exams_fixture() -> None:
+    """Exams are read from the first table only, rows without a subject are skipped."""
+    records = parse_exams(load_fixture("dashboard_exams.html"), today=date(2025, 12, 18))
+
+    assert records == [
+        ExamRecord("2026-01-09", "Mathematik", "08:00 - 09:30"),
+        ExamRecord("2026-01-13", "Englisch", "10:00 - 10:45"),
+        ExamRecord("2025-12-19", "Deutsch", "11:50"),
+    ]
+
+
+def test_parse_exams_subject_earlier_in_row() -> None:
+    """The subject text may appear before its cell, which broke row.split(subject)."""
+    html = (
+        '<table><tr title="Mathe Klausur" class="Mathe">'
+        "<td><strong>Mathe</strong></td><td>Mathe, Mo., 12.01., 08:00 - 09:30</td>"
+        "</tr></table>"
+    )
+
+    assert parse_exams(html, today=date(2026, 1, 5)) == [
+        ExamRecord("2026-01-12", "Mathe", "08:00 - 09:30")
+    ]
+
+
+def test_parse_exams_entities_and_whitespace() -> None:
+    """Entities are decoded and whitespace in the subject is collapsed."""
+    html = (
+        "<table><tr><td><strong>\n  Kunst &amp;\n  Design </strong></td>"
+        "<td>Do.,&nbsp;05.03., 07:55&nbsp;-&nbsp;09:25</td></tr></table>"
+    )
+
+    assert parse_exams(html, today=date(2026, 3, 1)) == [
+        ExamRecord("2026-03-05", "Kunst & Design", "07:55 - 09:25")
+    ]
+
+
+def test_parse_exams_invalid_date_is_skipped() -> None:
+    """A day that exists in no nearby year drops its row, not the table."""
+    html = (
+        "<table>"
+        "<tr><td><strong>Physik</strong></td><td>Mo., 31.02., 08:00</td></tr>"
+        "<tr><td><strong>Chemie</strong></td><td>Di., 03.03., 08:00</td></tr>"
+        "</table>"
+    )
+
+    assert parse_exams(html, today=date(2026, 2, 20)) == [
+        ExamRecord("2026-03-03", "Chemie", "08:00")
+    ]
+
+
+def test_parse_exams_without_table() -> None:
+    """A dashboard without an exam table has no exams."""
+    assert parse_exams("<div>Keine Termine</div>", today=date(2026, 1, 1)) == []
+
+
+@pytest.mark.parametrize(
+    ("day", "month", "today", "expected"),
+    [
+        # Same year
+        (15, 3, date(2026, 3, 1), date(2026, 3, 15)),
+        # Scraped in December, the exam is in January
+        (9, 1, date(2025, 12, 18), date(2026, 1, 9)),
+        # Scraped in January, the exam was in December
+        (19, 12, date(2026, 1, 7), date(2025, 12, 19)),
+        # Leap day of this year
+        (29, 2, date(2028, 2, 1), date(2028, 2, 29)),
+        # Leap day of the next year, this year has none
+        (29, 2, date(2027, 12, 1), date(2028, 2, 29)),
+        # Leap day of the last year, this year has none
+        (29, 2, date(2025, 1, 10), date(2024, 2, 29)),
+        # Leap day only valid this year, although it is more than half a year ago
+        (29, 2, date(2024, 12, 1), date(2024, 2, 29)),
+    ],
+)
+def test_infer_date(day: int, month: int, today: date, expected: date) -> None:
+    """The year is the one that puts the date closest to the scrape date."""
+    assert infer_date(day, month, today) == expected
+
+
+def test_infer_date_invalid() -> None:
+    """A day that does not exist in any candidate year raises ValueError."""
+    with pytest.raises(ValueError):
+        infer_date(31, 4, date(2026, 4, 1))
+
+
+def test_parse_exams_large_dashboard() -> None:
+    """A dashboard with two thousand rows is parsed in well under a second."""
+    row = (
+        '<tr _ngcontent-ng-c1=""><td _ngcontent-ng-c1=""><strong _ngcontent-ng-c1="">'
+        "Fach {index}</strong></td><td _ngcontent-ng-c1="">\nMo., {day:02d}.{month:02d}.,\n"
+        '<br _ngcontent-ng-c1="">08:00 - 09:30\n</td></tr>'
+    )
+    rows = 2000
+    html = "<table><tbody>{}</tbody></table>".format(
+        "".join(
+            row.format(index=index, day=index % 28 + 1, month=index % 12 + 1)
+            for index in range(rows)
+        )
+    )
+
+    started = time.perf_counter()
+    records = parse_exams(html, today=date(2026, 1, 1))
+    elapsed = time.perf_counter() - started
+
+    print(f"Parsed {rows} exam rows ({len(html)} characters) in {elapsed * 1000:.1f} ms")
+    assert len(records) == rows
+    assert elapsed < 1.0
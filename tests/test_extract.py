@@ -0,0 +1,115 @@
+"""Benchmark of extracting the scraped containers instead of reading the whole page."""
+from datetime import date
+from html.parser import HTMLParser
+import sys
+from typing import Any, Callable, List, Optional, Tuple
+
+import pytest
+
+from conftest import load_fixture
+from schulmanager_online.parsers import (
+    _VOID_ELEMENTS,
+    parse_exams,
+    parse_homework,
+    parse_timetable,
+)
+
+Attrs = List[Tuple[str, Optional[str]]]
+
+
+class _OuterHTMLExtractor(HTMLParser):
+    """Collect the source of the outermost elements a predicate matches.
+
+    Stands in for the script the scraper runs in the browser, which joins
+    the outerHTML of the containers matched by a selector like
+    `.tile:not(.tile .tile)`.
+    """
+
+    def __init__(self, html: str, matches: Callable[[str, Attrs], bool]) -> None:
+        """Initialize the extractor for a page."""
+        super().__init__(convert_charrefs=True)
+        self.fragments: List[str] = []
+        self._html = html
+        self._matches = matches
+        self._line_starts = [0]
+        for index, char in enumerate(html):
+            if char == "\n":
+                self._line_starts.append(index + 1)
+        self._open: List[str] = []
+        self._start: Optional[int] = None
+        self._depth = 0
+
+    def _offset(self) -> int:
+        """Return the offset of the current tag in the page."""
+        line, column = self.getpos()
+        return self._line_starts[line - 1] + column
+
+    def handle_starttag(self, tag: str, attrs: Attrs) -> None:
+        """Start a fragment at a matching element outside of other fragments."""
+        if self._start is None and self._matches(tag, attrs):
+            self._start = self._offset()
+            self._depth = len(self._open)
+        if tag not in _VOID_ELEMENTS:
+            self._open.append(tag)
+
+    def handle_endtag(self, tag: str) -> None:
+        """End the fragment when its element closes."""
+        if tag in _VOID_ELEMENTS or not self._open:
+            return
+        self._open.pop()
+        if self._start is not None and len(self._open) == self._depth:
+            end = self._html.index(">", self._offset()) + 1
+            self.fragments.append(self._html[self._start:end])
+            self._start = None
+
+
+def _extract(html: str, matches: Callable[[str, Attrs], bool]) -> str:
+    """Return the joined HTML of the outermost elements matched in a page."""
+    extractor = _OuterHTMLExtractor(html, matches)
+    extractor.feed(html)
+    extractor.close()
+    return "".join(extractor.fragments)
+
+
+def _is_tile(tag: str, attrs: Attrs) -> bool:
+    """Match `.tile`."""
+    return "tile" in (dict(attrs).get("class") or "").split()
+
+
+@pytest.mark.parametrize(
+    ("fixture", "matches", "parse"),
+    [
+        ("homework_page.html", _is_tile, parse_homework),
+        (
+            "dashboard_page.html",
+            lambda tag, attrs: tag == "table",
+            lambda html: parse_exams(html, today=date(2025, 12, 18)),
+        ),
+        (
+            "schedules_page.html",
+            lambda tag, attrs: tag == "class-hour-calendar",
+            parse_timetable,
+        ),
+    ],
+    ids=["homework", "exams", "timetable"],
+)
+def test_extracted_fragments_benchmark(
+    fixture: str, matches: Callable[[str, Attrs], bool], parse: Callable[[str], Any]
+) -> None:
+    """The extracted containers parse like the full page and are a fraction of its size."""
+    page = load_fixture(fixture)
+    fragments = _extract(page, matches)
+
+    result = parse(fragments)
+    assert result
+    assert result == parse(page)
+
+    page_bytes, fragment_bytes = len(page.encode()), len(fragments.encode())
+    print(
+        f"\n{fixture}:"
+        f"\n  transferred: {page_bytes} -> {fragment_bytes} bytes"
+        f" ({100 * (1 - fragment_bytes / page_bytes):.0f}% less)"
+        f"\n  str size:    {sys.getsizeof(page)} -> {sys.getsizeof(fragments)} bytes"
+    )
+    assert fragment_bytes < page_bytes / 2
+    assert sys.getsizeof(fragments) < sys.getsizeof(page) / 2
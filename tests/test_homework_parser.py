@@ -0,0 +1,141 @@
+"""Tests for the homework page parser."""
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from conftest import load_fixture
+from schulmanager_online.parsers import HomeworkRecord, parse_homework
+
+
+def _split_chain_parse(html: str) -> List[Dict[str, Any]]:
+    """The homework parsing the single-pass parser replaced, for comparison."""
+    blocks = html.split("tile\">")
+    blocks.pop(0)
+    homework_list = []
+    for block in blocks:
+        homework_item = _parse_homework_block(block)
+        if homework_item:
+            homework_list.extend(homework_item)
+    return homework_list
+
+
+def _parse_homework_block(block: str) -> Optional[List[Dict[str, Any]]]:
+    """Parse a homework block with split() calls, as before."""
+    try:
+        date_str = block.split(", ", 1)[1].split("\n")[0]
+
+        lessons = block.split("<h4 ")
+        lessons.pop(0)
+        subjects = []
+        for lesson in lessons:
+            subjects.append(lesson.split(">")[1].split("<")[0])
+
+        tasks = block.split("<span ")
+        tasks.pop(0)
+        task_list = []
+        for task in tasks:
+            task_list.append(task.split(">")[1].split("<")[0])
+
+        day, month, year = date_str.split(".")
+        formatted_date = f"{year}-{month.zfill(2)}-{day.zfill(2)}"
+
+        return [
+            {
+                "date": formatted_date,
+                "subject": subject,
+                "task": task_list[index],
+                "description": f"{subject}: {task_list[index]}",
+            }
+            for index, subject in enumerate(subjects)
+            if index < len(task_list)
+        ]
+    except Exception:  # pylint: disable=broad-except
+        return None
+
+
+def test_parse_homework_fixture() -> None:
+    """Extra and nested spans, entities and subjects without a task are handled."""
+    records = parse_homework(load_fixture("homework_tiles.html"))
+
+    assert records == [
+        HomeworkRecord("2026-01-13", "Mathematik", "Buch S. 57, Nr. 3 a-c"),
+        HomeworkRecord(
+            "2026-01-13", "Deutsch", 'Gedicht "Der Panther" lernen & vortragen'
+        ),
+        HomeworkRecord("2026-01-14", "Englisch", "Vokabeln Unit 4 Workbook p. 12"),
+        HomeworkRecord("2026-01-14", "Biologie", "Seite 42 lesen und zusammenfassen"),
+    ]
+    assert records[0].as_dict() == {
+        "date": "2026-01-13",
+        "subject": "Mathematik",
+        "task": "Buch S. 57, Nr. 3 a-c",
+        "description": "Mathematik: Buch S. 57, Nr. 3 a-c",
+    }
+
+
+def test_split_chain_misaligns_fixture() -> None:
+    """The split chain paired subjects with the wrong tasks on the same fixture."""
+    items = _split_chain_parse(load_fixture("homework_tiles.html"))
+
+    # The badge span before the first subject shifted every task by one
+    assert items[0]["subject"] == "Mathematik"
+    assert items[0]["task"] == "2"
+
+
+def test_parse_homework_ignores_content_outside_tiles() -> None:
+    """Only tiles are parsed, spans and headings around them are ignored."""
+    html = (
+        "<h4>Hausaufgaben</h4><span>Filter</span>"
+        '<div class="tile">Freitag, 7.2.2026<h4>Physik</h4><span>Versuch</span></div>'
+        "<span>Fußzeile</span>"
+    )
+
+    assert parse_homework(html) == [HomeworkRecord("2026-02-07", "Physik", "Versuch")]
+
+
+def _large_page(tiles: int) -> str:
+    """Return a homework page with many tiles of three subjects each."""
+    tile = (
+        '<div _ngcontent-ng-c1="" class="tile"><div _ngcontent-ng-c1="" class="tile-header">'
+        "Montag, {day:02d}.01.2026\n</div>"
+        + "".join(
+            f'<h4 _ngcontent-ng-c1="" class="subject">Fach {subject}</h4>'
+            f'<span _ngcontent-ng-c1="" class="homework">Aufgabe {subject}</span>'
+            for subject in range(3)
+        )
+        + "</div>"
+    )
+    return "".join(tile.format(day=index % 28 + 1) for index in range(tiles))
+
+
+def _measure(parse: Callable[[str], list], html: str) -> Tuple[float, int, int]:
+    """Return the parse time in seconds, the peak allocation in bytes and the item count."""
+    started = time.perf_counter()
+    items = parse(html)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    try:
+        parse(html)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return elapsed, peak, len(items)
+
+
+def test_parse_homework_benchmark() -> None:
+    """Compare parse time and peak allocations with the split chain on a large page."""
+    html = _large_page(500)
+
+    new_time, new_peak, new_count = _measure(parse_homework, html)
+    old_time, old_peak, old_count = _measure(_split_chain_parse, html)
+
+    print(
+        f"\nHomework page of {len(html)} characters:"
+        f"\n  single pass: {new_time * 1000:.1f} ms, peak {new_peak // 1024} KiB"
+        f"\n  split chain: {old_time * 1000:.1f} ms, peak {old_peak // 1024} KiB"
+    )
+    assert new_count == old_count == 1500
+    # Splitting copies the page several times, the parser only keeps the records
+    assert new_peak < old_peak
+    assert new_time < 1.0
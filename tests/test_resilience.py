@@ -0,0 +1,66 @@
+"""Tests for the circuit breaker."""
+import pytest
+
+from schulmanager_online import resilience
+from schulmanager_online.resilience import (
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+    CircuitBreaker,
+)
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> list:
+    """Replace the monotonic clock with one the test advances."""
+    now = [1000.0]
+    monkeypatch.setattr(resilience.time, "monotonic", lambda: now[0])
+    return now
+
+
+def _opened_breaker() -> CircuitBreaker:
+    """Return a breaker opened by one failure, with a reset timeout of a minute."""
+    breaker = CircuitBreaker(
+        "test", failure_threshold=1, reset_timeout=60, max_reset_timeout=600
+    )
+    breaker.record_failure(RuntimeError("down"))
+    return breaker
+
+
+def test_half_open_lets_one_trial_through(clock: list) -> None:
+    """Only the first caller after the reset timeout gets to try."""
+    breaker = _opened_breaker()
+    assert not breaker.allow_request()
+
+    clock[0] += 60
+    assert breaker.state == STATE_HALF_OPEN
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+    assert breaker.state == STATE_OPEN
+
+    breaker.record_success()
+    assert breaker.state == STATE_CLOSED
+    assert breaker.allow_request()
+
+
+def test_failed_trial_doubles_timeout(clock: list) -> None:
+    """A failed trial opens the breaker for twice as long."""
+    breaker = _opened_breaker()
+    clock[0] += 60
+    assert breaker.allow_request()
+    breaker.record_failure(RuntimeError("still down"))
+
+    clock[0] += 60
+    assert not breaker.allow_request()
+    clock[0] += 60
+    assert breaker.allow_request()
+
+
+def test_lost_trial_is_replaced(clock: list) -> None:
+    """A trial that never reports back does not keep the breaker open for good."""
+    breaker = _opened_breaker()
+    clock[0] += 60
+    assert breaker.allow_request()
+
+    clock[0] += 60
+    assert breaker.allow_request()
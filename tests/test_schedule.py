@@ -0,0 +1,98 @@
+"""Tests for the schedule-aware polling intervals."""
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from homeassistant.util import dt as dt_util  # noqa: E402
+
+from schulmanager_online.const import CONF_IDLE_SCAN_INTERVAL  # noqa: E402
+from schulmanager_online.models import Lesson, TimetableWeek  # noqa: E402
+from schulmanager_online.schedule import SchulmanagerOnlinePollingSchedule  # noqa: E402
+
+BERLIN = ZoneInfo("Europe/Berlin")
+# Monday of ISO week 3 of 2026
+MONDAY = date(2026, 1, 12)
+SCAN_INTERVAL = timedelta(minutes=5)
+
+
+@pytest.fixture(autouse=True)
+def time_zone(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Use a local time zone other than UTC for the active hours."""
+    monkeypatch.setattr(dt_util, "DEFAULT_TIME_ZONE", BERLIN)
+
+
+def _at(day: date, hour: int, minute: int = 0) -> datetime:
+    """Return a local point in time on a day."""
+    return datetime(day.year, day.month, day.day, hour, minute, tzinfo=BERLIN)
+
+
+@pytest.mark.parametrize(
+    ("now", "interval"),
+    [
+        # The active interval is a lower bound for sources polled more often
+        (_at(MONDAY + timedelta(days=2), 6), timedelta(minutes=15)),
+        (_at(MONDAY + timedelta(days=2), 17, 59), timedelta(minutes=15)),
+        # The active hours end at 18:00, the next ones start in 12 hours
+        (_at(MONDAY + timedelta(days=2), 18), timedelta(hours=6)),
+        # Before school the idle interval is cut short, to at least a minute
+        (_at(MONDAY + timedelta(days=2), 3), timedelta(hours=3)),
+        (_at(MONDAY + timedelta(days=2), 5, 59), timedelta(minutes=1)),
+        # Weekends are idle, also during the active hours
+        (_at(MONDAY + timedelta(days=5), 3), timedelta(hours=6)),
+        (_at(MONDAY + timedelta(days=6), 10), timedelta(hours=6)),
+    ],
+)
+def test_interval(now: datetime, interval: timedelta) -> None:
+    """Inside the active hours of a school day the active interval applies, else the idle one."""
+    schedule = SchulmanagerOnlinePollingSchedule()
+
+    assert schedule.interval(SCAN_INTERVAL, now) == interval
+
+
+def test_source_interval_longer_than_active() -> None:
+    """A source polled less often than the active interval keeps its own interval."""
+    schedule = SchulmanagerOnlinePollingSchedule()
+
+    now = _at(MONDAY, 10)
+    assert schedule.interval(timedelta(hours=1), now) == timedelta(hours=1)
+
+
+@pytest.mark.parametrize(
+    ("now", "interval"),
+    [
+        # Friday evening the next school day is Monday, the whole idle interval applies
+        (_at(MONDAY + timedelta(days=4), 18), timedelta(hours=12)),
+        # Sunday evening it is cut short to 6:00 on Monday
+        (_at(MONDAY + timedelta(days=6), 22), timedelta(hours=8)),
+    ],
+)
+def test_next_school_day_across_weekend(now: datetime, interval: timedelta) -> None:
+    """The idle interval only waits for the next school day, skipping the weekend."""
+    schedule = SchulmanagerOnlinePollingSchedule({CONF_IDLE_SCAN_INTERVAL: 12 * 60})
+
+    assert schedule.interval(SCAN_INTERVAL, now) == interval
+
+
+def test_free_day_in_timetable() -> None:
+    """A weekday without lessons in the timetable is not a school day."""
+    schedule = SchulmanagerOnlinePollingSchedule({CONF_IDLE_SCAN_INTERVAL: 12 * 60})
+    thursday = MONDAY + timedelta(days=3)
+    before = schedule.interval(SCAN_INTERVAL, _at(thursday, 20))
+
+    # Lessons from Monday to Thursday, Friday is free
+    week = TimetableWeek(1)
+    for weekday in range(4):
+        week.set(weekday, 1, Lesson(1, "M"))
+    schedule.update_timetable({"2026-W03": week})
+
+    assert not schedule.is_school_day(thursday + timedelta(days=1))
+    assert before == timedelta(hours=10)
+    assert schedule.interval(SCAN_INTERVAL, _at(thursday, 20)) == timedelta(hours=12)
+    assert schedule.interval(SCAN_INTERVAL, _at(thursday + timedelta(days=1), 10)) == timedelta(
+        hours=12
+    )
+    # Days after the fetched weeks fall back to Monday to Friday
+    assert schedule.is_school_day(MONDAY + timedelta(weeks=1))
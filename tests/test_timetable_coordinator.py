@@ -0,0 +1,177 @@
+"""Tests for the week cache of the timetable coordinator."""
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from homeassistant.util import dt as dt_util  # noqa: E402
+
+from schulmanager_online.api import SchulmanagerOnlineAPIError  # noqa: E402
+from schulmanager_online.const import (  # noqa: E402
+    TIMETABLE_CURRENT_WEEK_TTL,
+    TIMETABLE_FUTURE_WEEK_TTL,
+)
+from schulmanager_online.coordinator import (  # noqa: E402
+    SchulmanagerOnlineTimetableCoordinator,
+    week_key,
+)
+from schulmanager_online.models import Lesson, TimetableWeek  # noqa: E402
+
+# Monday of ISO week 3 of 2026
+MONDAY = date(2026, 1, 12)
+
+
+class _FakeAPI:
+    """Hands out a week per Monday and records which weeks were requested."""
+
+    def __init__(self, failing: Iterable[date] = ()) -> None:
+        """Initialize the API, failing for the given Mondays."""
+        self.requested: List[date] = []
+        self.failing = set(failing)
+
+    async def get_timetable(self, monday: date) -> TimetableWeek:
+        """Return a week with the date of its Monday as the only lesson."""
+        self.requested.append(monday)
+        if monday in self.failing:
+            raise SchulmanagerOnlineAPIError("API request failed with status 500")
+        week = TimetableWeek(1)
+        week.set(0, 1, Lesson(1, monday.isoformat()))
+        return week
+
+
+class _Clock:
+    """Stands in for the current time of Home Assistant."""
+
+    def __init__(self, monkeypatch: pytest.MonkeyPatch, now: datetime) -> None:
+        """Patch dt_util to return now."""
+        self.now = now
+        monkeypatch.setattr(dt_util, "now", lambda time_zone=None: self.now)
+        monkeypatch.setattr(dt_util, "utcnow", lambda: self.now)
+
+
+def _coordinator(api: _FakeAPI, weeks: int = 3) -> SchulmanagerOnlineTimetableCoordinator:
+    """Return a coordinator without a scraper, set up without Home Assistant running."""
+    coordinator = SchulmanagerOnlineTimetableCoordinator.__new__(
+        SchulmanagerOnlineTimetableCoordinator
+    )
+    coordinator.api = api
+    coordinator.scraper = None
+    coordinator._schedule = None
+    coordinator._weeks = weeks
+    coordinator._cache = {}
+    return coordinator
+
+
+def _fetch(coordinator: SchulmanagerOnlineTimetableCoordinator) -> Dict[str, Any]:
+    """Run one fetch of the coordinator."""
+    return asyncio.run(coordinator._async_fetch())
+
+
+def _at(day: date, hour: int, minute: int = 0) -> datetime:
+    """Return a point in time on a day."""
+    return datetime(day.year, day.month, day.day, hour, minute, tzinfo=timezone.utc)
+
+
+def test_week_key() -> None:
+    """Weeks are keyed by ISO week, also across the turn of the year."""
+    assert week_key(MONDAY) == "2026-W03"
+    assert week_key(date(2025, 12, 29)) == "2026-W01"
+
+
+@pytest.mark.parametrize(
+    ("today", "age", "stale"),
+    [
+        # Sunday still belongs to the current week
+        (MONDAY + timedelta(days=6), TIMETABLE_CURRENT_WEEK_TTL - timedelta(seconds=1), False),
+        (MONDAY + timedelta(days=6), TIMETABLE_CURRENT_WEEK_TTL, True),
+        # From the next Monday on the week is past and never fetched again
+        (MONDAY + timedelta(days=7), timedelta(days=30), False),
+        # A future week keeps for the longer TTL
+        (MONDAY - timedelta(days=1), TIMETABLE_CURRENT_WEEK_TTL, False),
+        (MONDAY - timedelta(days=1), TIMETABLE_FUTURE_WEEK_TTL, True),
+    ],
+)
+def test_is_stale(today: date, age: timedelta, stale: bool) -> None:
+    """Past weeks are never stale, the current and future weeks after their TTL."""
+    now = _at(today, 12)
+    assert SchulmanagerOnlineTimetableCoordinator._is_stale(MONDAY, today, now - age, now) is stale
+
+
+def test_fetch_window(monkeypatch: pytest.MonkeyPatch) -> None:
+    """The current and the following weeks are fetched, keyed by ISO week."""
+    _Clock(monkeypatch, _at(MONDAY + timedelta(days=2), 10))
+    api = _FakeAPI()
+    coordinator = _coordinator(api)
+
+    data = _fetch(coordinator)
+
+    assert api.requested == [MONDAY, MONDAY + timedelta(weeks=1), MONDAY + timedelta(weeks=2)]
+    assert list(data["timetable_weeks"]) == ["2026-W03", "2026-W04", "2026-W05"]
+    assert data["timetable"] is data["timetable_weeks"]["2026-W03"]
+
+
+def test_only_stale_weeks_are_fetched(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A poll within the TTLs fetches nothing, after the short TTL only the current week."""
+    clock = _Clock(monkeypatch, _at(MONDAY + timedelta(days=2), 10))
+    api = _FakeAPI()
+    coordinator = _coordinator(api)
+    _fetch(coordinator)
+
+    api.requested.clear()
+    clock.now += TIMETABLE_CURRENT_WEEK_TTL - timedelta(minutes=1)
+    _fetch(coordinator)
+    assert api.requested == []
+
+    clock.now += timedelta(minutes=1)
+    _fetch(coordinator)
+    assert api.requested == [MONDAY]
+
+
+def test_week_boundary(monkeypatch: pytest.MonkeyPatch) -> None:
+    """At midnight to Monday the window moves on and the past week is dropped."""
+    sunday = MONDAY + timedelta(days=6)
+    clock = _Clock(monkeypatch, _at(sunday, 23, 30))
+    api = _FakeAPI()
+    coordinator = _coordinator(api)
+    _fetch(coordinator)
+
+    api.requested.clear()
+    clock.now = _at(sunday + timedelta(days=1), 0, 30)
+    data = _fetch(coordinator)
+
+    # The new current week is past its short TTL, the next one is still fresh
+    next_monday = MONDAY + timedelta(weeks=1)
+    assert api.requested == [next_monday, next_monday + timedelta(weeks=2)]
+    assert list(data["timetable_weeks"]) == ["2026-W04", "2026-W05", "2026-W06"]
+    assert data["timetable"].day(0)[0].subject == next_monday.isoformat()
+
+
+def test_current_week_failing_uncached(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Without a cached current week its error fails the refresh."""
+    _Clock(monkeypatch, _at(MONDAY + timedelta(days=2), 10))
+    coordinator = _coordinator(_FakeAPI(failing=[MONDAY]))
+
+    with pytest.raises(SchulmanagerOnlineAPIError):
+        _fetch(coordinator)
+
+
+def test_failing_weeks_keep_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A failing future week is left out and a failing current week keeps its cache."""
+    clock = _Clock(monkeypatch, _at(MONDAY + timedelta(days=2), 10))
+    api = _FakeAPI(failing=[MONDAY + timedelta(weeks=2)])
+    coordinator = _coordinator(api)
+
+    data = _fetch(coordinator)
+    assert list(data["timetable_weeks"]) == ["2026-W03", "2026-W04"]
+
+    api.failing = {MONDAY}
+    clock.now += TIMETABLE_CURRENT_WEEK_TTL
+    previous = data["timetable"]
+    data = _fetch(coordinator)
+
+    assert data["timetable"] is previous
+    # The missing week was tried again and is back in the window
+    assert list(data["timetable_weeks"]) == ["2026-W03", "2026-W04", "2026-W05"]